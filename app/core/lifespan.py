@@ -0,0 +1,171 @@
+import asyncio
+import contextlib
+import logging
+import time
+from collections import deque
+from typing import Any, AsyncIterator, Awaitable, Callable, Deque, Dict
+
+from fastapi import FastAPI
+from graphql import get_introspection_query
+from sqlalchemy import Engine, select
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.orm import configure_mappers
+
+from app.core.local_menus import Chapter601
+from app.core.settings import (
+    REFERENCE_DATA_ENABLED,
+    RESPONSE_CACHE_ENABLED,
+    WARMUP_CONNECTIONS,
+    WARMUP_ENABLED,
+    WARMUP_RETRY_SECONDS,
+)
+from app.database.database import PRIMARY, REPLICA, LazySession, db, execute, route_session
+from app.database.executor import db_executor
+from app.graphql.loaders.address import addresses_statement
+from app.graphql.response_cache import response_cache
+from app.graphql.schema import schema
+from app.models.corporation import Company, Sites
+from app.models.customer import Customer
+from app.services.reference_data import reference_store
+
+logger = logging.getLogger(__name__)
+
+# Lookups run with a key that matches nothing: the statements are compiled and cached
+# by the engines without transferring any rows
+WARMUP_KEY = '#warm-up'
+HOT_STATEMENTS = (
+    lambda: select(Customer).where(Customer.customerCode == WARMUP_KEY),
+    lambda: select(Company).where(Company.company == WARMUP_KEY),
+    lambda: select(Sites).where(Sites.code == WARMUP_KEY),
+    lambda: addresses_statement(Chapter601.BUSINESS_PARTNER, [WARMUP_KEY]),
+)
+# Failed attempts kept for the readiness report, the oldest are dropped
+WARMUP_ERRORS_KEPT = 10
+
+
+class WarmUp:
+    """
+    Warm-up phase run when the application starts.
+    Pays up front the costs the first requests would otherwise pay, and tells
+    the readiness probe when it is done.
+    """
+
+    def __init__(self):
+        self.ready = False
+        self.steps: Dict[str, float] = {}
+        self.errors: Deque[str] = deque(maxlen=WARMUP_ERRORS_KEPT)
+
+    def report(self) -> Dict[str, Any]:
+        return {'ready': self.ready, 'steps_ms': self.steps, 'errors': list(self.errors)}
+
+    async def run(self) -> None:
+        """Run every step, retrying the phase until it succeeds."""
+        while True:
+            try:
+                await self._step('mappers', self._configure_mappers)
+                await self._step('schema', self._finalize_schema)
+                await self._step('connections', self._open_connections)
+                await self._step('statements', self._compile_statements)
+            except Exception as e:
+                self.errors.append(f'{type(e).__name__}: {e}')
+                logger.exception('Warm-up failed, retrying in %ss', WARMUP_RETRY_SECONDS)
+                await asyncio.sleep(WARMUP_RETRY_SECONDS)
+                continue
+
+            self.ready = True
+            logger.info('Warm-up finished: %s', self.steps)
+            return
+
+    async def _step(self, name: str, step: Callable[[], Awaitable[None]]) -> None:
+        started = time.perf_counter()
+        await step()
+        self.steps[name] = round((time.perf_counter() - started) * 1000, 3)
+        logger.info('Warm-up step %s took %.1f ms', name, self.steps[name])
+
+    @staticmethod
+    async def _configure_mappers() -> None:
+        # relationships and the wide Customer/Company/Sites mappers are configured on first use
+        configure_mappers()
+
+    @staticmethod
+    async def _finalize_schema() -> None:
+        # the standard introspection query is answered from the cache from now on
+        for query in ('query WarmUp { __typename }', get_introspection_query()):
+            result = await schema.execute(query, context_value={})
+            if result.errors:
+                raise result.errors[0]
+
+    @staticmethod
+    async def _open_connections() -> None:
+        engines = {db.engine, db.replica_engine}
+        for engine in engines:
+            if isinstance(engine, AsyncEngine):
+                await _open_async_connections(engine, WARMUP_CONNECTIONS)
+            else:
+                await db_executor.run(_open_sync_connections, engine, WARMUP_CONNECTIONS)
+
+    @staticmethod
+    async def _compile_statements() -> None:
+        routes = [PRIMARY] if db.replica_engine is db.engine else [PRIMARY, REPLICA]
+        for route in routes:
+            session = LazySession(db.SessionLocal)
+            route_session(session, route)
+            try:
+                for statement in HOT_STATEMENTS:
+                    await execute(session, statement())
+            finally:
+                await session.close()
+
+
+def _open_sync_connections(engine: Engine, count: int) -> None:
+    # connections are held together, otherwise the pool hands out the same one every time
+    connections = [engine.connect() for _ in range(count)]
+    try:
+        for connection in connections:
+            connection.exec_driver_sql('SELECT 1')
+    finally:
+        for connection in connections:
+            connection.close()
+
+
+async def _open_async_connections(engine: AsyncEngine, count: int) -> None:
+    async with contextlib.AsyncExitStack() as stack:
+        for _ in range(count):
+            connection = await stack.enter_async_context(engine.connect())
+            await connection.exec_driver_sql('SELECT 1')
+
+
+@contextlib.asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """
+    Start the warm-up, the response cache poller and the reference data refresh with the application, and stop them
+    and release the database resources on shutdown.
+    """
+    app.state.warmup = warmup = WarmUp()
+
+    tasks = []
+    if WARMUP_ENABLED:
+        # run in the background, so the liveness probe answers while the instance warms up
+        tasks.append(asyncio.create_task(warmup.run()))
+    else:
+        warmup.ready = True
+
+    if RESPONSE_CACHE_ENABLED:
+        tasks.append(asyncio.create_task(response_cache.run()))
+
+    if REFERENCE_DATA_ENABLED:
+        # the companies and sites are read from the database until the first load
+        tasks.append(asyncio.create_task(reference_store.run()))
+
+    try:
+        yield
+    finally:
+        for task in tasks:
+            task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+
+        result = db.close()
+        if asyncio.iscoroutine(result):
+            await result
+        db_executor.shutdown(wait=False, cancel_futures=True)
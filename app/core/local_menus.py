@@ -48,3 +48,11 @@ class Chapter48(IntEnum):
     MONTHLY = 3
     FISCAL_YEAR = 4
     PERIOD = 5
+
+
+class Chapter601(IntEnum):
+    """Chapter 601: Address entity type"""
+
+    BUSINESS_PARTNER = 1
+    COMPANY = 2
+    SITE = 3
@@ -0,0 +1,49 @@
+import threading
+from bisect import bisect_left
+from typing import Any, Dict, List, Tuple
+
+# Upper bounds (in seconds) of the wait time histogram buckets
+WAIT_TIME_BUCKETS: Tuple[float, ...] = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class WaitTimeHistogram:
+    """
+    Thread-safe histogram of wait times.
+    Buckets are reported cumulatively (le_<bound>), like a Prometheus histogram.
+    """
+
+    def __init__(self, buckets: Tuple[float, ...] = WAIT_TIME_BUCKETS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._bucket_counts: List[int] = [0] * (len(buckets) + 1)
+        self._count = 0
+        self._total = 0.0
+        self._max = 0.0
+
+    def observe(self, seconds: float) -> None:
+        """Record a wait time in seconds."""
+        with self._lock:
+            self._bucket_counts[bisect_left(self.buckets, seconds)] += 1
+            self._count += 1
+            self._total += seconds
+            self._max = max(self._max, seconds)
+
+    def snapshot(self, prefix: str = 'wait_seconds') -> Dict[str, Any]:
+        """Return a copy of the histogram, with its keys prefixed by `prefix`."""
+        with self._lock:
+            counts = list(self._bucket_counts)
+            count, total, maximum = self._count, self._total, self._max
+
+        histogram = {}
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets, counts):
+            cumulative += bucket_count
+            histogram[f'le_{bound}'] = cumulative
+        histogram['le_inf'] = cumulative + counts[-1]
+
+        return {
+            f'{prefix}_total': round(total, 6),
+            f'{prefix}_max': round(maximum, 6),
+            f'{prefix}_avg': round(total / count, 6) if count else 0.0,
+            f'{prefix}_histogram': histogram,
+        }
@@ -1,15 +1,97 @@
 from datetime import date, datetime
 
-from decouple import config
+from decouple import Csv, config
 
 DB_SERVER = config('DB_SERVER', default='localhost')
 DB_DATABASE = config('DB_DATABASE')
 DB_SCHEMA = config('DB_SCHEMA', default='dbo')
+# X3 folders (schemas of the database) a request may select, DB_SCHEMA is used when it selects none
+DB_FOLDERS = config('DB_FOLDERS', default=DB_SCHEMA, cast=Csv())
 DB_USERNAME = config('DB_USERNAME')
 DB_PASSWORD = config('DB_PASSWORD')
 DB_DRIVER = 'ODBC+Driver+17+for+SQL+Server'
 
 DB_CONNECTION_STRING = f'mssql+pyodbc://{DB_USERNAME}:{DB_PASSWORD}@{DB_SERVER}/{DB_DATABASE}?driver={DB_DRIVER}'
+DB_ASYNC_CONNECTION_STRING = f'mssql+aioodbc://{DB_USERNAME}:{DB_PASSWORD}@{DB_SERVER}/{DB_DATABASE}?driver={DB_DRIVER}'
+
+# Readable secondary (Always On) used by the query operations, the primary is used when not set
+DB_REPLICA_SERVER = config('DB_REPLICA_SERVER', default='')
+DB_REPLICA_CONNECTION_STRING = (
+    f'mssql+pyodbc://{DB_USERNAME}:{DB_PASSWORD}@{DB_REPLICA_SERVER}/{DB_DATABASE}'
+    f'?driver={DB_DRIVER}&ApplicationIntent=ReadOnly'
+)
+DB_ASYNC_REPLICA_CONNECTION_STRING = (
+    f'mssql+aioodbc://{DB_USERNAME}:{DB_PASSWORD}@{DB_REPLICA_SERVER}/{DB_DATABASE}'
+    f'?driver={DB_DRIVER}&ApplicationIntent=ReadOnly'
+)
+
+# Use the asynchronous (aioodbc) engine and AsyncSession in the GraphQL resolvers
+DB_ASYNC = config('DB_ASYNC', default=False, cast=bool)
+
+# Connection pool settings
+DB_POOL_SIZE = config('DB_POOL_SIZE', default=5, cast=int)
+DB_MAX_OVERFLOW = config('DB_MAX_OVERFLOW', default=10, cast=int)
+DB_POOL_TIMEOUT = config('DB_POOL_TIMEOUT', default=30, cast=float)
+DB_POOL_RECYCLE = config('DB_POOL_RECYCLE', default=1800, cast=int)
+DB_POOL_PRE_PING = config('DB_POOL_PRE_PING', default=True, cast=bool)
+DB_FAST_EXECUTEMANY = config('DB_FAST_EXECUTEMANY', default=True, cast=bool)
+
+# SQL logging: DB_ECHO logs every statement (development only), DB_LOG_SAMPLE_RATE
+# logs a fraction (0.0 - 1.0) of them, and statements slower than DB_SLOW_QUERY_SECONDS
+# go to the slow query log
+DB_ECHO = config('DB_ECHO', default=False, cast=bool)
+DB_LOG_SAMPLE_RATE = config('DB_LOG_SAMPLE_RATE', default=0.0, cast=float)
+DB_SLOW_QUERY_SECONDS = config('DB_SLOW_QUERY_SECONDS', default=0.5, cast=float)
+
+# Thread pool running the blocking (pyodbc) database calls of the resolvers
+DB_EXECUTOR_WORKERS = config('DB_EXECUTOR_WORKERS', default=DB_POOL_SIZE + DB_MAX_OVERFLOW, cast=int)
+DB_EXECUTOR_MAX_QUEUE = config('DB_EXECUTOR_MAX_QUEUE', default=200, cast=int)
+DB_EXECUTOR_QUEUE_TIMEOUT = config('DB_EXECUTOR_QUEUE_TIMEOUT', default=10, cast=float)
+
+# Startup warm-up: connections opened per engine, and pause between failed attempts
+WARMUP_ENABLED = config('WARMUP_ENABLED', default=True, cast=bool)
+WARMUP_CONNECTIONS = config('WARMUP_CONNECTIONS', default=DB_POOL_SIZE, cast=int)
+WARMUP_RETRY_SECONDS = config('WARMUP_RETRY_SECONDS', default=5, cast=float)
+
+# Relay connections: page size when the client asks for none, and the largest page it may ask for
+DEFAULT_PAGE_SIZE = config('DEFAULT_PAGE_SIZE', default=50, cast=int)
+MAX_PAGE_SIZE = config('MAX_PAGE_SIZE', default=500, cast=int)
+# Rows fetched per round trip by the streaming export routes
+EXPORT_BATCH_SIZE = config('EXPORT_BATCH_SIZE', default=1000, cast=int)
+# Accept (and mark as expensive) filters no index can serve on the large tables, instead of rejecting them
+ALLOW_UNINDEXED_FILTERS = config('ALLOW_UNINDEXED_FILTERS', default=False, cast=bool)
+# Most keys a lookup field (e.g. customersByCodes) accepts in one call
+LOOKUP_MAX_KEYS = config('LOOKUP_MAX_KEYS', default=10000, cast=int)
+# Change feeds leave out the rows changed in the last seconds, whose transactions may not be committed yet
+CHANGE_FEED_LAG_SECONDS = config('CHANGE_FEED_LAG_SECONDS', default=5, cast=int)
+
+# Query limits, checked before an operation runs: nesting depth, fields selected at one level
+# and estimated cost (objects and resolved fields, multiplied by the size of the lists above them)
+QUERY_MAX_DEPTH = config('QUERY_MAX_DEPTH', default=12, cast=int)
+QUERY_MAX_BREADTH = config('QUERY_MAX_BREADTH', default=100, cast=int)
+QUERY_MAX_COST = config('QUERY_MAX_COST', default=25000, cast=int)
+# Size assumed for the lists without a page size, e.g. the addresses of a customer
+QUERY_LIST_SIZE = config('QUERY_LIST_SIZE', default=20, cast=int)
+# Parsed and validated documents kept in memory, by query hash
+DOCUMENT_CACHE_SIZE = config('DOCUMENT_CACHE_SIZE', default=1000, cast=int)
+
+# Response cache of the reference-data queries (companies, sites): number of responses kept,
+# and the age after which a response is no longer served (its tables are polled twice as often)
+RESPONSE_CACHE_ENABLED = config('RESPONSE_CACHE_ENABLED', default=True, cast=bool)
+RESPONSE_CACHE_SIZE = config('RESPONSE_CACHE_SIZE', default=500, cast=int)
+RESPONSE_CACHE_MAX_AGE = config('RESPONSE_CACHE_MAX_AGE', default=60, cast=int)
+
+# Reference data (companies and sites) kept in memory
+REFERENCE_DATA_ENABLED = config('REFERENCE_DATA_ENABLED', default=True, cast=bool)
+REFERENCE_DATA_REFRESH_SECONDS = config('REFERENCE_DATA_REFRESH_SECONDS', default=30, cast=int)
+
+# Subscriptions: interval of the shared table pollers, and the changes a subscriber may fall behind by
+SUBSCRIPTION_POLL_SECONDS = config('SUBSCRIPTION_POLL_SECONDS', default=5, cast=float)
+SUBSCRIPTION_QUEUE_SIZE = config('SUBSCRIPTION_QUEUE_SIZE', default=1000, cast=int)
+
+# Responses compressed (brotli or gzip, as negotiated) from this size in bytes
+COMPRESSION_ENABLED = config('COMPRESSION_ENABLED', default=True, cast=bool)
+COMPRESSION_MIN_SIZE = config('COMPRESSION_MIN_SIZE', default=1024, cast=int)
 
 # Authentication settings
 SECRET_KEY = config('SECRET_KEY')
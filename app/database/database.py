@@ -1,24 +1,201 @@
-from typing import List, Type, Union
+import time
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+    TypeVar,
+    Union,
+)
 
-from sqlalchemy import create_engine
+from sqlalchemy import Engine, Executable, Result, Row, create_engine
+from sqlalchemy.engine import FrozenResult
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.sql.dml import UpdateBase
 from sqlmodel import SQLModel
 
-from app.core.settings import DB_CONNECTION_STRING
+from app.core.settings import (
+    DB_ASYNC,
+    DB_ASYNC_CONNECTION_STRING,
+    DB_ASYNC_REPLICA_CONNECTION_STRING,
+    DB_CONNECTION_STRING,
+    DB_ECHO,
+    DB_FAST_EXECUTEMANY,
+    DB_FOLDERS,
+    DB_MAX_OVERFLOW,
+    DB_POOL_PRE_PING,
+    DB_POOL_RECYCLE,
+    DB_POOL_SIZE,
+    DB_POOL_TIMEOUT,
+    DB_REPLICA_CONNECTION_STRING,
+    DB_REPLICA_SERVER,
+    DB_SCHEMA,
+)
+from app.database.executor import db_executor, session_lock
+from app.database.pool import InstrumentedAsyncQueuePool, InstrumentedQueuePool
+from app.database.sql_log import install_sampled_logging, log_if_slow
 
-# engine = create_engine(settings.DB_CONNECTION_STRING)
+T = TypeVar('T')
 
-# SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Routes of a RoutingSession
+PRIMARY = 'primary'
+REPLICA = 'replica'
+
+
+def _engine_options(poolclass: type) -> Dict[str, Any]:
+    return {
+        'echo': DB_ECHO,
+        'poolclass': poolclass,
+        'pool_size': DB_POOL_SIZE,
+        'max_overflow': DB_MAX_OVERFLOW,
+        'pool_timeout': DB_POOL_TIMEOUT,
+        'pool_recycle': DB_POOL_RECYCLE,
+        'pool_pre_ping': DB_POOL_PRE_PING,
+        'fast_executemany': DB_FAST_EXECUTEMANY,
+    }
+
+
+class UnknownFolderError(ValueError):
+    """Raised when a request selects a folder that is not in DB_FOLDERS."""
+
+
+# Engines bound to a folder, per (engine, folder)
+_folder_engines: Dict[Tuple[Engine, str], Engine] = {}
+
+
+def _folder_engine(engine: Engine, folder: Optional[str]) -> Engine:
+    """
+    Return `engine` rendering the DB_SCHEMA tables in `folder`.
+    The returned engine shares the pool of `engine`, so every folder uses the same connections.
+    """
+    if not folder or folder == DB_SCHEMA:
+        return engine
+
+    key = (engine, folder)
+    if key not in _folder_engines:
+        _folder_engines[key] = engine.execution_options(schema_translate_map={DB_SCHEMA: folder})
+    return _folder_engines[key]
+
+
+class RoutingSession(Session):
+    """
+    Session that sends the reads to the read replica when routed to it.
+    Flushes and INSERT/UPDATE/DELETE statements always go to the primary,
+    and so does everything while the session is routed to the primary (the default).
+    Statements run in the folder selected for the session (DB_SCHEMA by default).
+    """
+
+    def __init__(self, *args, primary: Engine, replica: Engine, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.primary = primary
+        self.replica = replica
+
+    def get_bind(self, mapper=None, clause=None, **kwargs) -> Engine:
+        if self.info.get('route') == REPLICA and not self._flushing and not isinstance(clause, UpdateBase):
+            engine = self.replica
+        else:
+            engine = self.primary
+
+        return _folder_engine(engine, self.info.get('folder'))
+
+
+class LazySession:
+    """
+    Request-scoped handle that opens its session the first time it is used.
+    Requests that never reach a resolver using the database (introspection, requests
+    rejected by IsAuthenticated, ...) never open a session or check out a connection.
+    """
+
+    def __init__(self, factory: Callable[[], Union[Session, AsyncSession]]):
+        self._factory = factory
+        self._session: Optional[Union[Session, AsyncSession]] = None
+        self._info: Dict[str, Any] = {}
+
+    @property
+    def session(self) -> Union[Session, AsyncSession]:
+        """The underlying session, opened on first access."""
+        if self._session is None:
+            self._session = self._factory()
+            self._session.info.update(self._info)
+        return self._session
+
+    @property
+    def info(self) -> Dict[str, Any]:
+        # set before the session is opened (e.g. its route), copied into it when it is
+        return self._session.info if self._session is not None else self._info
+
+    @property
+    def is_open(self) -> bool:
+        return self._session is not None
+
+    async def close(self) -> None:
+        """Close the session, if it was opened, returning its connection to the pool."""
+        if self._session is None:
+            return
+
+        session, self._session = self._session, None
+        if isinstance(session, AsyncSession):
+            await session.close()
+        else:
+            async with session_lock(session):
+                await db_executor.run(session.close)
+
+
+# Session handed to the resolvers, depending on the DB_ASYNC setting
+DbSession = Union[Session, AsyncSession, LazySession]
+
+
+def route_session(session: DbSession, route: str) -> None:
+    """Route the statements of a session to the PRIMARY or REPLICA engine."""
+    session.info['route'] = route
+
+
+def select_folder(session: DbSession, folder: str) -> str:
+    """
+    Run the statements of a session in `folder`, which must be one of DB_FOLDERS.
+    The name is matched case-insensitively and returned as spelled in DB_FOLDERS.
+    """
+    for allowed in DB_FOLDERS:
+        if allowed.upper() == folder.upper():
+            session.info['folder'] = allowed
+            return allowed
+
+    raise UnknownFolderError(f'Folder {folder} is not available.')
+
+
+def folder_of(session: DbSession) -> str:
+    """Return the folder (schema) the statements of a session run in, for the raw SQL statements."""
+    return session.info.get('folder') or DB_SCHEMA
 
 
 class DatabaseSession:
     """Database session manager."""
 
-    def __init__(self, url: str = DB_CONNECTION_STRING):
+    def __init__(self, url: str = DB_CONNECTION_STRING, replica_url: Optional[str] = None):
         """Initialize the database session manager."""
-        self.engine = create_engine(url, echo=True)
+        if replica_url is None and DB_REPLICA_SERVER:
+            replica_url = DB_REPLICA_CONNECTION_STRING
+
+        self.engine = create_engine(url, **_engine_options(InstrumentedQueuePool))
+        self.replica_engine = (
+            create_engine(replica_url, **_engine_options(InstrumentedQueuePool)) if replica_url else self.engine
+        )
+        install_sampled_logging(self.engine)
+        if self.replica_engine is not self.engine:
+            install_sampled_logging(self.replica_engine)
         self.SessionLocal = sessionmaker(
             bind=self.engine,
+            class_=RoutingSession,
+            primary=self.engine,
+            replica=self.replica_engine,
             autoflush=False,
             autocommit=False,
         )
@@ -26,6 +203,14 @@ class DatabaseSession:
     # close connection
     def close(self):
         self.engine.dispose()
+        self.replica_engine.dispose()
+
+    def pool_statistics(self) -> Dict[str, Any]:
+        """Return the live statistics of the connection pools."""
+        statistics = {PRIMARY: self.engine.pool.statistics()}
+        if self.replica_engine is not self.engine:
+            statistics[REPLICA] = self.replica_engine.pool.statistics()
+        return statistics
 
     def create_tables(self, models: Union[Type[SQLModel], List[Type[SQLModel]]]):
         if not isinstance(models, list):
@@ -35,13 +220,20 @@ class DatabaseSession:
             for model in models:
                 model.__table__.create(bind=conn, checkfirst=True)
 
-    def get_db(self):
+    def get_db(self) -> Iterator[Session]:
         db = self.SessionLocal()
         try:
             yield db
         finally:
             db.close()
 
+    async def get_lazy_db(self) -> AsyncIterator[LazySession]:
+        handle = LazySession(self.SessionLocal)
+        try:
+            yield handle
+        finally:
+            await handle.close()
+
     def commit_rollback(self, session: Session):  # noqa: PLR6301
         try:
             session.commit()
@@ -50,36 +242,131 @@ class DatabaseSession:
             raise
 
 
-db = DatabaseSession()
+class AsyncDatabaseSession:
+    """Asynchronous database session manager, backed by the aioodbc driver."""
+
+    def __init__(self, url: str = DB_ASYNC_CONNECTION_STRING, replica_url: Optional[str] = None):
+        """Initialize the asynchronous database session manager."""
+        if replica_url is None and DB_REPLICA_SERVER:
+            replica_url = DB_ASYNC_REPLICA_CONNECTION_STRING
+
+        self.engine = create_async_engine(url, **_engine_options(InstrumentedAsyncQueuePool))
+        self.replica_engine = (
+            create_async_engine(replica_url, **_engine_options(InstrumentedAsyncQueuePool))
+            if replica_url
+            else self.engine
+        )
+        install_sampled_logging(self.engine.sync_engine)
+        if self.replica_engine is not self.engine:
+            install_sampled_logging(self.replica_engine.sync_engine)
+        # objects are returned to Strawberry after the commit, they must not expire
+        self.SessionLocal = async_sessionmaker(
+            bind=self.engine,
+            class_=AsyncSession,
+            sync_session_class=RoutingSession,
+            primary=self.engine.sync_engine,
+            replica=self.replica_engine.sync_engine,
+            autoflush=False,
+            expire_on_commit=False,
+        )
+
+    # close connection
+    async def close(self):
+        await self.engine.dispose()
+        await self.replica_engine.dispose()
+
+    def pool_statistics(self) -> Dict[str, Any]:
+        """Return the live statistics of the connection pools."""
+        statistics = {PRIMARY: self.engine.pool.statistics()}
+        if self.replica_engine is not self.engine:
+            statistics[REPLICA] = self.replica_engine.pool.statistics()
+        return statistics
+
+    async def get_db(self) -> AsyncIterator[AsyncSession]:
+        async with self.SessionLocal() as session:
+            yield session
+
+    async def get_lazy_db(self) -> AsyncIterator[LazySession]:
+        handle = LazySession(self.SessionLocal)
+        try:
+            yield handle
+        finally:
+            await handle.close()
+
+    async def commit_rollback(self, session: AsyncSession):  # noqa: PLR6301
+        try:
+            await session.commit()
+        except Exception:
+            await session.rollback()
+            raise
+
+
+async def execute(session: DbSession, statement: Executable, params: Optional[Mapping[str, Any]] = None) -> Result:
+    """
+    Execute a statement on a synchronous or asynchronous session.
+    Resolvers call this instead of session.execute so they work in both modes;
+    synchronous sessions run in the database executor, off the event loop.
+    """
+    if isinstance(session, LazySession):
+        session = session.session
+
+    if isinstance(session, AsyncSession):
+        started = time.perf_counter()
+        frozen = (await session.execute(statement, params)).freeze()
+        log_if_slow(statement, params, started, rows=len(frozen.data))
+    else:
+        async with session_lock(session):
+            frozen = await db_executor.run(_execute_buffered, session, statement, params)
 
-# def get_db() -> Session:  # type: ignore
-#     """Get a synchronous database session."""
-#     db = SessionLocal()
-#     try:
-#         yield db
-#     finally:
-#         db.close()
+    return frozen()
 
 
-# from sqlalchemy.ext.io import AsyncSession, async_sessionmaker, create_async_engine
+async def run_sync(session: DbSession, fn: Callable[..., T], *args, **kwargs) -> T:
+    """
+    Run a function that receives a synchronous Session as its first argument,
+    such as the services and repositories, on either kind of session.
+    """
+    if isinstance(session, LazySession):
+        session = session.session
 
-# from app.core import settings
+    if isinstance(session, AsyncSession):
+        return await session.run_sync(fn, *args, **kwargs)
+
+    async with session_lock(session):
+        return await db_executor.run(fn, session, *args, **kwargs)
+
+
+async def stream(session: DbSession, statement: Executable, batch_size: int) -> AsyncIterator[Sequence[Row]]:
+    """
+    Execute a statement with a server-side cursor (yield_per) and yield its rows in batches.
+    Only one batch is held in memory, however many rows the statement returns.
+    """
+    if isinstance(session, LazySession):
+        session = session.session
+
+    statement = statement.execution_options(yield_per=batch_size)
+
+    if isinstance(session, AsyncSession):
+        result = await session.stream(statement)
+        async for rows in result.partitions(batch_size):
+            yield rows
+        return
+
+    async with session_lock(session):
+        result = await db_executor.run(session.execute, statement)
+        try:
+            while rows := await db_executor.run(result.fetchmany, batch_size):
+                yield rows
+        finally:
+            await db_executor.run(result.close)
 
-# engine = create_async_engine(settings.DB_CONNECTION_STRING)
 
-# AsyncSessionLocal = async_sessionmaker(
-#     bind=engine,
-#     class_=AsyncSession,
-#     expire_on_commit=False,
-#     autocommit=False,
-#     autoflush=False,
-# )
+def _execute_buffered(session: Session, statement: Executable, params: Optional[Mapping[str, Any]]) -> FrozenResult:
+    # rows, and the eager loads fired while fetching them, are read in the executor thread
+    started = time.perf_counter()
+    frozen = session.execute(statement, params).freeze()
+    log_if_slow(statement, params, started, rows=len(frozen.data))
+    return frozen
 
 
-# async def get_async_db() -> AsyncSession:  # type: ignore
-#     """Get an asynchronous database session."""
-#     async with AsyncSessionLocal() as session:
-#         try:
-#             yield session
-#         except Exception:
-#             raise
+db = AsyncDatabaseSession() if DB_ASYNC else DatabaseSession()
@@ -0,0 +1,135 @@
+import asyncio
+import contextvars
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+from app.core.metrics import WaitTimeHistogram
+from app.core.settings import DB_EXECUTOR_MAX_QUEUE, DB_EXECUTOR_QUEUE_TIMEOUT, DB_EXECUTOR_WORKERS
+
+T = TypeVar('T')
+
+
+class DatabaseBusyError(TimeoutError):
+    """Raised when database work is rejected because the executor is saturated."""
+
+
+class DatabaseExecutor:
+    """
+    Size-limited thread pool for blocking database calls.
+    Keeps pyodbc off the event loop, bounds the number of queued calls and drops
+    calls that waited in the queue longer than the deadline instead of running them late.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = DB_EXECUTOR_WORKERS,
+        max_queue: int = DB_EXECUTOR_MAX_QUEUE,
+        queue_timeout: float = DB_EXECUTOR_QUEUE_TIMEOUT,
+    ):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='db-executor')
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._running = 0
+        self._completed = 0
+        self._failed = 0
+        self._rejected = 0
+        self._expired = 0
+        self.wait_time = WaitTimeHistogram()
+
+    async def run(self, fn: Callable[..., T], *args, **kwargs) -> T:
+        """Run `fn(*args, **kwargs)` in the pool and await its result."""
+        with self._lock:
+            if self._queued >= self.max_queue:
+                self._rejected += 1
+                raise DatabaseBusyError(f'Database queue is full ({self.max_queue} calls waiting).')
+            self._queued += 1
+
+        # the caller's context variables (e.g. the resolver path of the SQL logs) follow the call
+        context = contextvars.copy_context()
+        submitted = time.perf_counter()
+        future: Future = self._executor.submit(context.run, self._call, submitted, fn, *args, **kwargs)
+        future.add_done_callback(self._forget_cancelled)
+
+        expired = False
+
+        def expire() -> None:
+            # a call still queued at the deadline is cancelled, one already running is not
+            nonlocal expired
+            if future.cancel():
+                expired = True
+                with self._lock:
+                    self._expired += 1
+
+        deadline = asyncio.get_running_loop().call_later(self.queue_timeout, expire)
+
+        try:
+            return await asyncio.wrap_future(future)
+        except asyncio.CancelledError:
+            if expired:
+                raise DatabaseBusyError(f'Database call waited more than {self.queue_timeout}s in the queue.') from None
+            raise
+        finally:
+            deadline.cancel()
+
+    def _forget_cancelled(self, future: Future) -> None:
+        # cancelled calls never reach _call, so they leave the queue here
+        if future.cancelled():
+            with self._lock:
+                self._queued -= 1
+
+    def _call(self, submitted: float, fn: Callable[..., T], *args, **kwargs) -> T:
+        self.wait_time.observe(time.perf_counter() - submitted)
+
+        with self._lock:
+            self._queued -= 1
+            self._running += 1
+
+        try:
+            result = fn(*args, **kwargs)
+        except Exception:
+            with self._lock:
+                self._failed += 1
+            raise
+        else:
+            with self._lock:
+                self._completed += 1
+            return result
+        finally:
+            with self._lock:
+                self._running -= 1
+
+    def statistics(self) -> Dict[str, Any]:
+        """Return the queue depth, the call counters and the queue wait histogram."""
+        with self._lock:
+            counters = {
+                'max_workers': self.max_workers,
+                'max_queue': self.max_queue,
+                'queue_timeout': self.queue_timeout,
+                'queue_depth': self._queued,
+                'running': self._running,
+                'completed': self._completed,
+                'failed': self._failed,
+                'rejected': self._rejected,
+                'expired': self._expired,
+            }
+
+        return {**counters, **self.wait_time.snapshot(prefix='queue_wait_seconds')}
+
+    def shutdown(self, wait: bool = True, cancel_futures: Optional[bool] = False) -> None:
+        self._executor.shutdown(wait=wait, cancel_futures=cancel_futures)
+
+
+db_executor = DatabaseExecutor()
+
+
+def session_lock(session: Any) -> asyncio.Lock:
+    """
+    Return the lock that serializes the executor calls made for a session.
+    A Session is not thread-safe, and sibling resolvers of the same request run concurrently.
+    """
+    return session.info.setdefault('executor_lock', asyncio.Lock())
@@ -79,6 +79,8 @@ class ArrayColumnMixin:
 
         # 4. Create the hybrid_property using the getter and setter functions
         array_prop = hybrid_property(fget=getter, fset=setter)
+        # the attributes behind the property, for the column projection of the queries
+        array_prop.info['columns'] = tuple(internal_attr_names)
 
         # 5. Return the hybrid_property and the dictionary of mapped columns
         return array_prop, mapped_columns
@@ -0,0 +1,88 @@
+import threading
+import time
+from typing import Any, Dict
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, PoolProxiedConnection, QueuePool
+
+from app.core.metrics import WaitTimeHistogram
+
+
+class PoolMetrics:
+    """
+    Thread-safe counters for a connection pool.
+    The pool only knows how many connections it holds, so this class keeps
+    what it doesn't: how long callers waited for a connection and how many gave up.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._checkouts = 0
+        self._timeouts = 0
+        self.wait_time = WaitTimeHistogram()
+
+    def observe_wait(self, seconds: float, timed_out: bool = False) -> None:
+        """Record the time a caller spent waiting for a connection."""
+        self.wait_time.observe(seconds)
+
+        with self._lock:
+            if timed_out:
+                self._timeouts += 1
+            else:
+                self._checkouts += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return a copy of the counters and of the wait time histogram."""
+        with self._lock:
+            counters = {'checkouts': self._checkouts, 'timeouts': self._timeouts}
+
+        return {**counters, **self.wait_time.snapshot()}
+
+
+class _InstrumentedPoolMixin:
+    """
+    Records the time spent waiting on every checkout of a QueuePool.
+    The wait includes queueing behind other callers, the pre-ping and, when the
+    pool grows, the time to open a new connection.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def connect(self) -> PoolProxiedConnection:
+        start = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            self.metrics.observe_wait(time.perf_counter() - start, timed_out=True)
+            raise
+
+        self.metrics.observe_wait(time.perf_counter() - start)
+        return connection
+
+    def recreate(self):
+        # engine.dispose() and invalidation after a failover recreate the pool,
+        # keep the counters so the statistics survive it
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+    def statistics(self) -> Dict[str, Any]:
+        """Return the live state of the pool together with the checkout metrics."""
+        return {
+            'pool_size': self.size(),
+            'max_overflow': self._max_overflow,
+            'checked_in': self.checkedin(),
+            'checked_out': self.checkedout(),
+            'overflow': max(self.overflow(), 0),
+            **self.metrics.snapshot(),
+        }
+
+
+class InstrumentedQueuePool(_InstrumentedPoolMixin, QueuePool):
+    """QueuePool with checkout metrics, used by the synchronous engine."""
+
+
+class InstrumentedAsyncQueuePool(_InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool with checkout metrics, used by the asynchronous engine."""
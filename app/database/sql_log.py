@@ -0,0 +1,88 @@
+import hashlib
+import logging
+import random
+import time
+from contextvars import ContextVar
+from typing import Any, Optional
+
+from sqlalchemy import Engine, Executable, event
+
+from app.core.settings import DB_LOG_SAMPLE_RATE, DB_SLOW_QUERY_SECONDS
+
+sql_logger = logging.getLogger('app.sql')
+slow_query_logger = logging.getLogger('app.sql.slow')
+
+# GraphQL path of the resolver running the current statement, set by the ResolverPath extension
+resolver_path: ContextVar[Optional[str]] = ContextVar('resolver_path', default=None)
+
+# Longest SQL text written to the logs
+MAX_LOGGED_SQL = 2000
+
+
+def fingerprint(params: Any) -> str:
+    """
+    Short, stable hash of the parameter values of a statement.
+    Identical calls can be told apart and correlated without logging the values themselves.
+    """
+    if isinstance(params, dict):
+        params = sorted(params.items())
+    return hashlib.sha1(repr(params).encode(), usedforsecurity=False).hexdigest()[:12]
+
+
+def install_sampled_logging(engine: Engine, sample_rate: float = DB_LOG_SAMPLE_RATE) -> None:
+    """
+    Log a random sample of the statements executed by an engine.
+    Replaces echo=True, which formats and writes every statement and its parameters.
+    Nothing is installed when the sample rate is 0.
+    """
+    if sample_rate <= 0:
+        return
+
+    @event.listens_for(engine, 'before_cursor_execute')
+    def _start(conn, cursor, statement, parameters, context, executemany):  # noqa: PLR0913, PLR0917
+        if context is not None and random.random() < sample_rate:
+            context.sql_log_start = time.perf_counter()
+
+    @event.listens_for(engine, 'after_cursor_execute')
+    def _log(conn, cursor, statement, parameters, context, executemany):  # noqa: PLR0913, PLR0917
+        started = getattr(context, 'sql_log_start', None)
+        if started is None:
+            return
+
+        record = {
+            'duration_ms': round((time.perf_counter() - started) * 1000, 3),
+            'rowcount': cursor.rowcount,
+            'path': resolver_path.get(),
+            'params': fingerprint(parameters),
+            'sql': statement[:MAX_LOGGED_SQL],
+        }
+        sql_logger.info(
+            'duration_ms=%(duration_ms)s rowcount=%(rowcount)s path=%(path)s params=%(params)s sql=%(sql)s',
+            record,
+            extra={'sql_log': record},
+        )
+
+
+def log_if_slow(statement: Executable, params: Any, started: float, rows: int) -> None:
+    """
+    Write a slow query log entry when a statement, including the fetch of its rows
+    and the eager loads fired by them, took longer than DB_SLOW_QUERY_SECONDS.
+    """
+    duration = time.perf_counter() - started
+    if duration < DB_SLOW_QUERY_SECONDS:
+        return
+
+    # only compiled on the slow path, to recover the values bound inside ORM statements
+    compiled = statement.compile()
+    record = {
+        'duration_ms': round(duration * 1000, 3),
+        'rows': rows,
+        'path': resolver_path.get(),
+        'params': fingerprint({**compiled.params, **(params or {})}),
+        'sql': str(compiled)[:MAX_LOGGED_SQL],
+    }
+    slow_query_logger.warning(
+        'duration_ms=%(duration_ms)s rows=%(rows)s path=%(path)s params=%(params)s sql=%(sql)s',
+        record,
+        extra={'sql_log': record},
+    )
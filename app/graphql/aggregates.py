@@ -0,0 +1,16 @@
+from typing import List
+
+from sqlalchemy import ColumnElement, Select, func
+
+from app.database.database import DbSession, execute
+from app.graphql.types.aggregate import GroupCount
+
+
+async def count_by(db: DbSession, stmt: Select, column: ColumnElement) -> List[GroupCount]:
+    """
+    Count the rows of `stmt` per value of `column`, with one GROUP BY in the database.
+    Only the groups travel back, never the rows.
+    """
+    grouped = stmt.with_only_columns(column, func.count(), maintain_column_froms=True).group_by(column).order_by(column)
+    result = await execute(db, grouped)
+    return [GroupCount(key=None if key is None else str(key), count=count) for key, count in result.all()]
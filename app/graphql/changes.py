@@ -0,0 +1,92 @@
+import datetime
+from typing import Any, Optional, Sequence, Tuple, Type
+
+from sqlalchemy import DateTime, Select, cast, func, literal_column, select
+from sqlalchemy.orm.interfaces import ORMOption
+
+from app.core.settings import CHANGE_FEED_LAG_SECONDS, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from app.database.database import DbSession, execute
+from app.graphql.pagination import decode_cursor, encode_cursor, keyset_predicate
+from app.graphql.types.pagination import ChangeFeed
+
+# Path of the nodes in the selection of a change feed field
+FEED_PATH = ('nodes',)
+
+# Watermark of an empty table (the smallest DATETIME)
+NO_CHANGE = datetime.datetime(1753, 1, 1)
+
+
+def encode_watermark(updated: datetime.datetime, row_id: Any) -> str:
+    """Opaque watermark holding the UPDDATTIM_0 and ROWID of a change."""
+    return encode_cursor([updated.isoformat(), int(row_id)])
+
+
+def decode_watermark(watermark: str) -> Tuple[datetime.datetime, int]:
+    try:
+        updated, row_id = decode_cursor(watermark, 2)
+        return datetime.datetime.fromisoformat(updated), int(row_id)
+    except (TypeError, ValueError) as e:
+        raise ValueError('Invalid watermark.') from e
+
+
+def _settled(stmt: Select, model: Type[Any]) -> Select:
+    """Leave out the rows changed in the last CHANGE_FEED_LAG_SECONDS."""
+    if not CHANGE_FEED_LAG_SECONDS:
+        return stmt
+    # the database clock stamps UPDDATTIM_0 (see AuditMixin), so it sets the cutoff too
+    cutoff = func.dateadd(literal_column('second'), -CHANGE_FEED_LAG_SECONDS, func.now())
+    return stmt.where(model.updateDatetime < cutoff)
+
+
+async def latest_watermark(db: DbSession, model: Type[Any]) -> str:
+    """The watermark of the latest change of the table of `model`: a feed read after it starts from now."""
+    stmt = select(model.updateDatetime, model.id).order_by(model.updateDatetime.desc(), model.id.desc()).limit(1)
+    row = (await execute(db, _settled(stmt, model))).first()
+    return encode_watermark(*row) if row is not None else encode_watermark(NO_CHANGE, 0)
+
+
+async def changes(  # noqa: PLR0913, PLR0917
+    db: DbSession,
+    stmt: Select,
+    model: Type[Any],
+    options: Sequence[ORMOption] = (),
+    since: Optional[datetime.datetime] = None,
+    after: Optional[str] = None,
+    first: Optional[int] = None,
+) -> ChangeFeed:
+    """
+    The rows of `stmt` changed since `since` (UPDDATTIM_0 >= since) or after the `after` watermark,
+    in (UPDDATTIM_0, ROWID) order, `first` rows at a time. A sync reads the pages with the returned
+    watermark until hasMore is false, and keeps the last watermark for its next run.
+    Rows changed in the last CHANGE_FEED_LAG_SECONDS are left for a later call: a transaction
+    committing late with an older UPDDATTIM_0 would otherwise fall behind the watermark.
+    """
+    size = DEFAULT_PAGE_SIZE if first is None else first
+    if not 0 < size <= MAX_PAGE_SIZE:
+        raise ValueError(f'Page size must be between 1 and {MAX_PAGE_SIZE}.')
+
+    keys = (model.updateDatetime, model.id)
+    if after:
+        updated, row_id = decode_watermark(after)
+        # CAST: a datetime2 parameter would not compare equal to the DATETIME column it was read from
+        stmt = stmt.where(keyset_predicate(keys, (cast(updated, DateTime), row_id)))
+    if since is not None:
+        stmt = stmt.where(model.updateDatetime >= cast(since, DateTime))
+    stmt = _settled(stmt, model)
+
+    # one row more than the page tells whether more changes follow
+    result = await execute(db, stmt.options(*options).order_by(*keys).limit(size + 1))
+    rows = result.scalars().all()
+
+    has_more = len(rows) > size
+    rows = rows[:size]
+
+    if rows:
+        watermark = encode_watermark(rows[-1].updateDatetime, rows[-1].id)
+    elif after:
+        watermark = after
+    else:
+        # ROWID starts at 1, so this watermark reads the rows changed at `since` too
+        watermark = encode_watermark(since, 0) if since is not None else None
+
+    return ChangeFeed(nodes=rows, watermark=watermark, hasMore=has_more)
@@ -0,0 +1,98 @@
+import hashlib
+from collections import OrderedDict
+from contextvars import ContextVar
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from graphql import DocumentNode, GraphQLError, GraphQLSchema
+
+from app.core.settings import DOCUMENT_CACHE_SIZE
+
+# Hash of the persisted query being executed, None for the other requests
+persisted_query: ContextVar[Optional[str]] = ContextVar('persisted_query', default=None)
+
+
+class PersistedQueryNotFound(LookupError):
+    """Raised when a request sends only the hash of a query the server does not know."""
+
+
+class CachedDocument(NamedTuple):
+    query: str
+    document: DocumentNode
+    errors: List[GraphQLError]
+
+
+# Distinct introspection queries kept: tools send a handful of them
+INTROSPECTION_CACHE_SIZE = 100
+
+
+class DocumentCache:
+    """LRU of parsed and validated documents, keyed by the SHA-256 of their query text."""
+
+    def __init__(self, maxsize: int = DOCUMENT_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._documents: 'OrderedDict[str, CachedDocument]' = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str, count: bool = True) -> Optional[CachedDocument]:
+        """The document cached under `key`; `count` records the lookup in the hit/miss counters."""
+        cached = self._documents.get(key)
+        if cached is not None:
+            self._documents.move_to_end(key)
+        if count:
+            if cached is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return cached
+
+    def put(self, key: str, cached: CachedDocument) -> None:
+        self._documents[key] = cached
+        self._documents.move_to_end(key)
+        while len(self._documents) > self.maxsize:
+            self._documents.popitem(last=False)
+
+    def statistics(self) -> Dict[str, Any]:
+        return {'size': len(self._documents), 'maxsize': self.maxsize, 'hits': self.hits, 'misses': self.misses}
+
+
+class IntrospectionCache:
+    """
+    Results of the introspection queries, keyed by query hash, operation name and variables.
+    They only depend on the schema, so they are dropped when the schema object changes.
+    """
+
+    def __init__(self, maxsize: int = INTROSPECTION_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.schema: Optional[GraphQLSchema] = None
+        self._results: Dict[Tuple[str, Optional[str], str], Dict[str, Any]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, schema: GraphQLSchema, key: Tuple[str, Optional[str], str]) -> Optional[Dict[str, Any]]:
+        if schema is not self.schema:
+            self.schema = schema
+            self._results = {}
+
+        data = self._results.get(key)
+        if data is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return data
+
+    def put(self, schema: GraphQLSchema, key: Tuple[str, Optional[str], str], data: Dict[str, Any]) -> None:
+        if schema is self.schema and len(self._results) < self.maxsize:
+            self._results[key] = data
+
+    def statistics(self) -> Dict[str, Any]:
+        return {'size': len(self._results), 'maxsize': self.maxsize, 'hits': self.hits, 'misses': self.misses}
+
+
+def query_hash(query: str) -> str:
+    """The hash identifying a query document, as sent by the persisted query clients."""
+    return hashlib.sha256(query.encode()).hexdigest()
+
+
+documents = DocumentCache()
+introspection = IntrospectionCache()
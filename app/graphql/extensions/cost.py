@@ -0,0 +1,181 @@
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from graphql import (
+    ExecutionResult,
+    FieldNode,
+    FragmentDefinitionNode,
+    FragmentSpreadNode,
+    GraphQLError,
+    GraphQLField,
+    GraphQLList,
+    GraphQLNonNull,
+    GraphQLObjectType,
+    GraphQLSchema,
+    InlineFragmentNode,
+    OperationDefinitionNode,
+    OperationType,
+    SelectionSetNode,
+    get_named_type,
+    get_operation_ast,
+    is_leaf_type,
+)
+from graphql.execution.values import get_argument_values, get_variable_values
+from strawberry.extensions import SchemaExtension
+from strawberry.schema.schema_converter import GraphQLCoreConverter
+
+from app.core.settings import DEFAULT_PAGE_SIZE, QUERY_LIST_SIZE, QUERY_MAX_BREADTH, QUERY_MAX_COST, QUERY_MAX_DEPTH
+
+
+class CostEstimator:
+    """
+    Estimates the cost of an operation from its document, before it runs.
+    Every object and every field with a resolver of its own weighs 1 (or the `cost` of
+    its metadata), multiplied by the size of the lists above it: the page size (first or
+    last, DEFAULT_PAGE_SIZE by default) for the edges of a connection, the length of the
+    argument named by `size_argument` in their metadata for the lookups, QUERY_LIST_SIZE
+    for the other lists. Also measures the depth and the breadth (fields selected at one
+    level, fragments included) of the operation.
+    """
+
+    def __init__(self, schema: GraphQLSchema, fragments: Dict[str, FragmentDefinitionNode], variables: Dict[str, Any]):
+        self.schema = schema
+        self.fragments = fragments
+        self.variables = variables
+        self.depth = 0
+        self.breadth = 0
+
+    def estimate(self, operation: OperationDefinitionNode) -> int:
+        root = self.schema.get_root_type(operation.operation)
+        return self._cost(root, operation.selection_set, 1, None)
+
+    def _fields(self, parent: GraphQLObjectType, selection_set: SelectionSetNode) -> List[Tuple[Any, FieldNode]]:
+        fields = []
+        for selection in selection_set.selections:
+            if isinstance(selection, FieldNode):
+                fields.append((parent, selection))
+            elif isinstance(selection, FragmentSpreadNode):
+                fragment = self.fragments[selection.name.value]
+                fields.extend(
+                    self._fields(self.schema.get_type(fragment.type_condition.name.value), fragment.selection_set)
+                )
+            elif isinstance(selection, InlineFragmentNode):
+                condition = selection.type_condition
+                type_ = self.schema.get_type(condition.name.value) if condition else parent
+                fields.extend(self._fields(type_, selection.selection_set))
+        return fields
+
+    def _cost(
+        self, parent: GraphQLObjectType, selection_set: SelectionSetNode, depth: int, page_size: Optional[int]
+    ) -> int:
+        fields = [
+            (type_, node) for type_, node in self._fields(parent, selection_set) if not node.name.value.startswith('__')
+        ]
+        self.depth = max(self.depth, depth)
+        self.breadth = max(self.breadth, len(fields))
+
+        cost = 0
+        for type_, node in fields:
+            definition: GraphQLField = type_.fields[node.name.value]
+            arguments = get_argument_values(definition, node, self.variables)
+
+            # the page size of a connection applies to the edges below it
+            size = None
+            if 'first' in definition.args or 'last' in definition.args:
+                requested = arguments.get('first') if arguments.get('first') is not None else arguments.get('last')
+                size = DEFAULT_PAGE_SIZE if requested is None else requested
+
+            field_type = definition.type.of_type if isinstance(definition.type, GraphQLNonNull) else definition.type
+            multiplier = 1
+            if isinstance(field_type, GraphQLList):
+                multiplier = QUERY_LIST_SIZE if page_size is None else page_size
+
+                # lists as long as one of their arguments, e.g. the codes of a lookup
+                sized_by = _metadata(definition).get('size_argument')
+                size_value = arguments.get(sized_by) if sized_by is not None else None
+                if size_value is not None:
+                    multiplier = len(size_value) if isinstance(size_value, list) else 1
+
+            children = 0
+            if node.selection_set is not None:
+                children = self._cost(get_named_type(field_type), node.selection_set, depth + 1, size)
+
+            cost += multiplier * (_weight(definition) + children)
+        return cost
+
+
+def _metadata(definition: GraphQLField) -> Dict[str, Any]:
+    field = definition.extensions.get(GraphQLCoreConverter.DEFINITION_BACKREF)
+    return field.metadata if field is not None else {}
+
+
+def _weight(definition: GraphQLField) -> int:
+    field = definition.extensions.get(GraphQLCoreConverter.DEFINITION_BACKREF)
+    if field is not None and 'cost' in field.metadata:
+        return field.metadata['cost']
+
+    has_resolver = field is not None and field.base_resolver is not None
+    return 1 if has_resolver or not is_leaf_type(get_named_type(definition.type)) else 0
+
+
+class QueryCost(SchemaExtension):
+    """
+    Rejects operations deeper than QUERY_MAX_DEPTH, selecting more than QUERY_MAX_BREADTH
+    fields at one level or costing more than QUERY_MAX_COST, before any resolver (and SQL) runs.
+    The estimate is reported in the `cost` extension of the response.
+    """
+
+    def on_execute(self) -> Iterator[None]:
+        # the subscriptions share one instance of the extension: the report is kept in their own context
+        context = self.execution_context
+        document = context.graphql_document
+        operation = get_operation_ast(document, context.operation_name)
+
+        # the variables as the resolvers get them, e.g. first: "10" is refused, not counted as 10
+        variables = None
+        if operation is not None:
+            variables = get_variable_values(
+                context.schema._schema, operation.variable_definitions or (), context.variables or {}
+            )
+
+        # variables that do not coerce are reported by the execution itself
+        report: Dict[str, Any] = {}
+        if isinstance(variables, dict):
+            fragments = {
+                definition.name.value: definition
+                for definition in document.definitions
+                if isinstance(definition, FragmentDefinitionNode)
+            }
+            estimator = CostEstimator(context.schema._schema, fragments, variables)
+            cost = estimator.estimate(operation)
+            report = {
+                'estimated': cost,
+                'limit': QUERY_MAX_COST,
+                'depth': estimator.depth,
+                'breadth': estimator.breadth,
+            }
+            context.extensions_results['cost'] = report
+
+            error = _limit_error(cost, estimator.depth, estimator.breadth)
+            if error is not None:
+                rejection = GraphQLError(error, extensions={'code': 'QUERY_TOO_COMPLEX'})
+                # a subscription ignores the result set here, but ends with the error raised
+                if operation.operation == OperationType.SUBSCRIPTION:
+                    raise rejection
+                context.result = ExecutionResult(data=None, errors=[rejection])
+
+        yield
+
+        # resolvers that had to scan a table (see apply_filter)
+        expensive = context.context.get('expensive_fields') if isinstance(context.context, dict) else None
+        if expensive and report:
+            report['expensiveFields'] = expensive
+
+
+def _limit_error(cost: int, depth: int, breadth: int) -> Optional[str]:
+    if depth > QUERY_MAX_DEPTH:
+        return f'Query is nested {depth} levels deep, the limit is {QUERY_MAX_DEPTH}.'
+    if breadth > QUERY_MAX_BREADTH:
+        return f'Query selects {breadth} fields at one level, the limit is {QUERY_MAX_BREADTH}.'
+    if cost > QUERY_MAX_COST:
+        return f'Query cost is estimated at {cost}, the limit is {QUERY_MAX_COST}.'
+    return None
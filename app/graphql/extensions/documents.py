@@ -0,0 +1,74 @@
+import json
+from typing import Any, Iterator, Optional, Tuple
+
+from graphql import ExecutionResult, FieldNode, OperationDefinitionNode, OperationType, get_operation_ast
+from strawberry.extensions import SchemaExtension
+
+from app.graphql.documents import CachedDocument, documents, introspection, persisted_query, query_hash
+
+
+class CachedDocuments(SchemaExtension):
+    """
+    Parses and validates a query once: its document and validation errors are kept under
+    the query hash (the hash of a persisted query, or the hash of the query text), and the
+    later executions of the query skip both steps.
+    """
+
+    def __init__(self, *, execution_context: Any = None):
+        super().__init__(execution_context=execution_context)
+        self.key: Optional[str] = None
+        self.cached: Optional[CachedDocument] = None
+
+    def on_parse(self) -> Iterator[None]:
+        context = self.execution_context
+        self.key = persisted_query.get() or query_hash(context.query)
+        self.cached = documents.get(self.key)
+
+        if self.cached is not None:
+            context.graphql_document = self.cached.document
+        yield
+
+    def on_validate(self) -> Iterator[None]:
+        context = self.execution_context
+        if self.cached is not None:
+            # errors already set: the validation is not run again
+            context.errors = list(self.cached.errors)
+        yield
+
+        if self.cached is None and context.graphql_document is not None:
+            documents.put(self.key, CachedDocument(context.query, context.graphql_document, context.errors or []))
+
+
+class CachedIntrospection(SchemaExtension):
+    """
+    Serves the introspection queries (every root field is a meta field, e.g. __schema)
+    from the results of their first execution, without running them again.
+    """
+
+    def __init__(self, *, execution_context: Any = None):
+        super().__init__(execution_context=execution_context)
+        self.key: Optional[Tuple[str, Optional[str], str]] = None
+
+    def on_execute(self) -> Iterator[None]:
+        context = self.execution_context
+        operation = get_operation_ast(context.graphql_document, context.operation_name)
+        graphql_schema = context.schema._schema
+
+        if operation is not None and _is_introspection(operation):
+            variables = json.dumps(context.variables or {}, sort_keys=True, default=str)
+            self.key = (query_hash(context.query), context.operation_name, variables)
+            data = introspection.get(graphql_schema, self.key)
+            if data is not None:
+                context.result = ExecutionResult(data=data, errors=None)
+        yield
+
+        result = context.result
+        if self.key is not None and result is not None and not result.errors and result.data is not None:
+            introspection.put(graphql_schema, self.key, result.data)
+
+
+def _is_introspection(operation: OperationDefinitionNode) -> bool:
+    return operation.operation == OperationType.QUERY and all(
+        isinstance(selection, FieldNode) and selection.name.value.startswith('__')
+        for selection in operation.selection_set.selections
+    )
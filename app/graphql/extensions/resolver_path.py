@@ -0,0 +1,46 @@
+from inspect import isawaitable
+from typing import Any, Callable
+
+from graphql import GraphQLResolveInfo
+from strawberry.extensions import SchemaExtension
+from strawberry.schema.schema_converter import GraphQLCoreConverter
+
+from app.database.sql_log import resolver_path
+
+
+def _path(info: GraphQLResolveInfo) -> str:
+    # list indexes are dropped, so every row of a list logs the same path
+    return '.'.join(key for key in info.path.as_list() if isinstance(key, str))
+
+
+class ResolverPath(SchemaExtension):
+    """
+    Exposes the path of the running resolver (e.g. customers.customerAddresses)
+    to the SQL logs. Fields without a resolver of their own are skipped.
+    """
+
+    def resolve(self, _next: Callable, root: Any, info: GraphQLResolveInfo, *args, **kwargs) -> Any:  # noqa: PLR6301
+        # meta fields (__typename) are not in the type's fields
+        definition = info.parent_type.fields.get(info.field_name)
+        field = definition.extensions.get(GraphQLCoreConverter.DEFINITION_BACKREF) if definition else None
+        if field is None or field.base_resolver is None:
+            return _next(root, info, *args, **kwargs)
+
+        path = _path(info)
+        token = resolver_path.set(path)
+        try:
+            result = _next(root, info, *args, **kwargs)
+        finally:
+            resolver_path.reset(token)
+
+        if isawaitable(result):
+            return _await_with_path(result, path)
+        return result
+
+
+async def _await_with_path(result: Any, path: str) -> Any:
+    token = resolver_path.set(path)
+    try:
+        return await result
+    finally:
+        resolver_path.reset(token)
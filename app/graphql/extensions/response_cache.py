@@ -0,0 +1,84 @@
+import json
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from graphql import ExecutionResult, FieldNode, OperationDefinitionNode, OperationType, get_operation_ast
+from strawberry.extensions import SchemaExtension
+from strawberry.schema.schema_converter import GraphQLCoreConverter
+
+from app.core.settings import RESPONSE_CACHE_ENABLED
+from app.database.database import folder_of
+from app.graphql.documents import query_hash
+from app.graphql.response_cache import CacheKey, response_cache
+from app.middleware.auth.permissions import context_authenticated
+from app.services.reference_data import reference_data
+
+
+class ResponseCaching(SchemaExtension):
+    """
+    Serves the queries whose root fields are all cacheable from the response cache.
+    A field is made cacheable with metadata={'cache_sources': (...)}, naming the sources
+    (see response_cache.SOURCES) whose changes invalidate its responses. Entries are kept
+    per folder and per generation of the reference data, and requests asking to read their
+    own writes bypass the cache.
+    """
+
+    def __init__(self, *, execution_context: Any = None):
+        super().__init__(execution_context=execution_context)
+        self.key: Optional[CacheKey] = None
+        self.versions: Optional[Dict[str, Tuple[Any, ...]]] = None
+
+    def on_execute(self) -> Iterator[None]:
+        context = self.execution_context
+        request_context = context.context if isinstance(context.context, dict) else {}
+        operation = get_operation_ast(context.graphql_document, context.operation_name)
+
+        sources = _cache_sources(context.schema._schema, operation) if operation is not None else None
+        cacheable = (
+            RESPONSE_CACHE_ENABLED
+            and sources
+            and context.result is None
+            and request_context.get('db') is not None
+            and not request_context.get('read_your_writes')
+        )
+
+        # the resolvers, and their permission checks, do not run on a hit
+        if cacheable and context_authenticated(request_context):
+            variables = json.dumps(context.variables or {}, sort_keys=True, default=str)
+            # the reference data refreshes on its own: a response built from an older copy is not served again
+            data = reference_data(request_context)
+            generation = data.generation if data is not None else None
+            folder = folder_of(request_context['db'])
+            key = (query_hash(context.query), context.operation_name, variables, folder, generation)
+            cached = response_cache.get(key, sources)
+            if cached is not None:
+                context.result = ExecutionResult(data=cached, errors=None)
+            else:
+                # versions read before the data: a change in between only invalidates the entry early
+                self.key, self.versions = key, response_cache.versions(key[3], sources)
+        yield
+
+        result = context.result
+        if self.key is not None and self.versions is not None and result is not None and not result.errors:
+            response_cache.put(self.key, result.data, self.versions)
+
+
+def _cache_sources(schema: Any, operation: OperationDefinitionNode) -> Optional[Tuple[str, ...]]:
+    """The sources of the root fields of a query, None when one of them is not cacheable."""
+    if operation.operation != OperationType.QUERY:
+        return None
+
+    root = schema.get_root_type(operation.operation)
+    sources = set()
+    for selection in operation.selection_set.selections:
+        if not isinstance(selection, FieldNode):
+            return None
+        if selection.name.value == '__typename':
+            continue
+
+        definition = root.fields.get(selection.name.value)
+        field = definition.extensions.get(GraphQLCoreConverter.DEFINITION_BACKREF) if definition else None
+        if field is None or 'cache_sources' not in field.metadata:
+            return None
+        sources.update(field.metadata['cache_sources'])
+
+    return tuple(sorted(sources)) or None
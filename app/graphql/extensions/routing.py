@@ -0,0 +1,25 @@
+from typing import Iterator
+
+from strawberry.extensions import SchemaExtension
+from strawberry.types.graphql import OperationType
+
+from app.database.database import PRIMARY, REPLICA, route_session
+
+
+class DatabaseRouting(SchemaExtension):
+    """
+    Routes the database session of the operation.
+    Queries and subscriptions read from the replica, mutations (and queries asking for
+    read-your-writes consistency) use the primary.
+    """
+
+    def on_execute(self) -> Iterator[None]:
+        context = self.execution_context.context
+        session = context.get('db')
+
+        if session is not None:
+            read_only = self.execution_context.operation_type in {OperationType.QUERY, OperationType.SUBSCRIPTION}
+            use_replica = read_only and not context.get('read_your_writes')
+            route_session(session, REPLICA if use_replica else PRIMARY)
+
+        yield
@@ -0,0 +1,19 @@
+from typing import AsyncIterator
+
+from strawberry.extensions import SchemaExtension
+
+from app.database.database import LazySession
+
+
+class ReleaseSession(SchemaExtension):
+    """
+    Closes the session of the operation as soon as it is executed, so its
+    connection goes back to the pool before the response is serialized and sent.
+    """
+
+    async def on_execute(self) -> AsyncIterator[None]:
+        yield
+
+        session = self.execution_context.context.get('db')
+        if isinstance(session, LazySession):
+            await session.close()
@@ -0,0 +1,19 @@
+from typing import Iterator
+
+from strawberry.extensions import SchemaExtension
+from strawberry.types.graphql import OperationType
+
+
+class SubscriptionContext(SchemaExtension):
+    """
+    Gives each subscription a copy of the context of its WebSocket, which is otherwise shared
+    by every operation of the connection. changed_rows replaces the session and the address
+    loader of the copy for each change it sends.
+    """
+
+    def on_execute(self) -> Iterator[None]:
+        context = self.execution_context
+        if context.operation_type == OperationType.SUBSCRIPTION and isinstance(context.context, dict):
+            context.context = dict(context.context)
+
+        yield
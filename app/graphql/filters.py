@@ -0,0 +1,49 @@
+from typing import Sequence
+
+from sqlalchemy import ColumnElement, Select
+from strawberry.types import Info
+
+from app.core.settings import ALLOW_UNINDEXED_FILTERS
+
+# Escape character of the LIKE patterns built from client values
+LIKE_ESCAPE = '/'
+
+
+class UnindexedFilterError(ValueError):
+    """Raised when a filter has no predicate an index can seek, on a table too large to scan."""
+
+
+def starts_with(column: ColumnElement, prefix: str) -> ColumnElement[bool]:
+    """
+    column LIKE 'prefix%', with the LIKE wildcards of the prefix escaped.
+    The pattern is a literal prefix, so SQL Server seeks an index on the column.
+    """
+    escaped = prefix.replace(LIKE_ESCAPE, LIKE_ESCAPE * 2)
+    for wildcard in ('%', '_', '['):
+        escaped = escaped.replace(wildcard, LIKE_ESCAPE + wildcard)
+    return column.like(escaped + '%', escape=LIKE_ESCAPE)
+
+
+def apply_filter(  # noqa: PLR0913
+    info: Info,
+    stmt: Select,
+    indexed: Sequence[ColumnElement[bool]],
+    residual: Sequence[ColumnElement[bool]],
+    *,
+    hint: str,
+    allow_scan: bool = False,
+) -> Select:
+    """
+    Add the predicates of a filter to `stmt`.
+    `indexed` are predicates an index can seek, `residual` the ones that are only checked
+    on the rows read. Residual predicates alone make SQL Server read the table until a page
+    is filled, so they are rejected unless the table is small (`allow_scan`) or
+    ALLOW_UNINDEXED_FILTERS is set; the resolver is then marked as expensive in the context.
+    `hint` names the indexed filter fields, for the error message.
+    """
+    if residual and not indexed:
+        if not (allow_scan or ALLOW_UNINDEXED_FILTERS):
+            raise UnindexedFilterError(f'This filter cannot use an index, combine it with {hint}.')
+        info.context.setdefault('expensive_fields', []).append(info.path.key)
+
+    return stmt.where(*indexed, *residual)
@@ -0,0 +1,52 @@
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+from sqlalchemy import Select, select
+from strawberry.dataloader import DataLoader
+
+from app.database.database import DbSession, execute
+from app.models.address import Address as AddressModel
+
+# (entityType, entityNumber) of the addresses of an entity
+AddressKey = Tuple[int, str]
+
+# SQL Server accepts at most 2100 parameters per statement
+MAX_KEYS_PER_QUERY = 1000
+
+
+def addresses_statement(entity_type: int, entity_numbers: List[str]) -> Select:
+    """Addresses of the entities of one type; BPATYP_0 = ? AND BPANUM_0 IN (...) seeks the BPADDRESS_BPA0 index."""
+    return (
+        select(AddressModel)
+        .where(AddressModel.entityType == entity_type, AddressModel.entityNumber.in_(entity_numbers))
+        .order_by(AddressModel.entityNumber, AddressModel.code)
+    )
+
+
+async def _load_addresses(db: DbSession, keys: List[AddressKey]) -> List[List[AddressModel]]:
+    numbers_by_type: Dict[int, List[str]] = defaultdict(list)
+    for entity_type, entity_number in keys:
+        numbers_by_type[entity_type].append(entity_number)
+
+    addresses: Dict[AddressKey, List[AddressModel]] = defaultdict(list)
+    for entity_type, numbers in numbers_by_type.items():
+        for start in range(0, len(numbers), MAX_KEYS_PER_QUERY):
+            stmt = addresses_statement(entity_type, numbers[start : start + MAX_KEYS_PER_QUERY])
+            result = await execute(db, stmt)
+            for address in result.scalars():
+                addresses[address.entityType, address.entityNumber].append(address)
+
+    return [addresses.get(key, []) for key in keys]
+
+
+def address_loader(db: DbSession) -> DataLoader[AddressKey, List[AddressModel]]:
+    """
+    Request-scoped loader of the addresses of customers, companies and sites.
+    Keys requested while resolving the same level of a query are batched into one
+    query per entity type.
+    """
+
+    async def load(keys: List[AddressKey]) -> List[List[AddressModel]]:
+        return await _load_addresses(db, keys)
+
+    return DataLoader(load_fn=load)
@@ -0,0 +1,52 @@
+import json
+from typing import Any, Iterator, List, Optional, Sequence
+
+from sqlalchemy import Select, UnicodeText, bindparam, func, literal_column, select
+from sqlalchemy.orm import InstrumentedAttribute
+from sqlalchemy.orm.interfaces import ORMOption
+
+from app.core.settings import LOOKUP_MAX_KEYS
+from app.database import database
+from app.database.database import DbSession, execute
+from app.graphql.loaders.address import MAX_KEYS_PER_QUERY
+
+
+def _statements(stmt: Select, column: InstrumentedAttribute, keys: List[Any]) -> Iterator[Select]:
+    if len(keys) > MAX_KEYS_PER_QUERY and database.db.engine.dialect.name == 'mssql':
+        # one parameter holding every key, instead of one query per chunk
+        values = bindparam('keys', json.dumps(keys), type_=UnicodeText)
+        yield stmt.where(column.in_(select(literal_column('value')).select_from(func.openjson(values))))
+        return
+
+    # IN lists stay under the 2100 parameters SQL Server accepts per statement
+    for start in range(0, len(keys), MAX_KEYS_PER_QUERY):
+        yield stmt.where(column.in_(keys[start : start + MAX_KEYS_PER_QUERY]))
+
+
+def check_keys(keys: Sequence[Any]) -> None:
+    """Refuse more than LOOKUP_MAX_KEYS keys, wherever they are looked up."""
+    if len(keys) > LOOKUP_MAX_KEYS:
+        raise ValueError(f'At most {LOOKUP_MAX_KEYS} keys can be looked up at once.')
+
+
+async def lookup(
+    db: DbSession,
+    stmt: Select,
+    column: InstrumentedAttribute,
+    keys: Sequence[Any],
+    options: Sequence[ORMOption] = (),
+) -> List[Optional[Any]]:
+    """
+    The rows of `stmt` whose unique `column` matches each of `keys`, in the order of the keys,
+    with None for the keys that match nothing. The keys are looked up with IN lists of at most
+    MAX_KEYS_PER_QUERY keys, or on SQL Server, past one list, with OPENJSON of a single parameter.
+    """
+    check_keys(keys)
+
+    found = {}
+    for statement in _statements(stmt.options(*options), column, list(dict.fromkeys(keys))):
+        result = await execute(db, statement)
+        for row in result.scalars():
+            found[getattr(row, column.key)] = row
+
+    return [found.get(key) for key in keys]
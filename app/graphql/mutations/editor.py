@@ -2,6 +2,7 @@ import strawberry
 from sqlalchemy.orm import Session
 from strawberry.types import Info
 
+from app.database.database import DbSession, run_sync
 from app.graphql.types.editor import EditorInput, EditorType
 from app.models.editor import Editor as EditorModel
 from app.services.counters import get_next_counter
@@ -49,24 +50,22 @@ def _create_editor(db: Session, editor_input: EditorInput, current_user: str) ->
 @strawberry.type
 class EditorMutation:
     @strawberry.field
-    def create_editor(  # O resolver ainda é async  # noqa: PLR6301
+    async def create_editor(  # noqa: PLR6301
         self, info: Info[ContextType, None], editor_input: EditorInput
     ) -> EditorType:
-        """Cria um novo registro de Editor (usando DB síncrono)."""
-        # 1. Obter a SESSÃO SÍNCRONA do contexto
-        db: Session = info.context.get('db')
+        """Cria um novo registro de Editor (DB síncrono ou assíncrono)."""
+        # 1. Obter a sessão do contexto
+        db: DbSession = info.context.get('db')
         if not db:
-            raise ValueError('Sessão do banco de dados (sync) não encontrada.')
+            raise ValueError('Sessão do banco de dados não encontrada.')
 
         current_user = 'INTER'
 
         try:
-            # 2. Executar a função síncrona auxiliar em um thread separado
-            new_editor_instance = _create_editor(db=db, editor_input=editor_input, current_user=current_user)
-            # Alternativa Python 3.9+:
-            # new_editor_instance = await asyncio.to_thread(
-            #     _create_editor, db, editor_input, current_user
-            # )
+            # 2. Executar a função síncrona auxiliar (via run_sync quando a sessão é assíncrona)
+            new_editor_instance = await run_sync(
+                db, _create_editor, editor_input=editor_input, current_user=current_user
+            )
 
             # 3. Retornar o resultado (Strawberry mapeará para EditorType)
             return new_editor_instance
@@ -1,7 +1,7 @@
 import strawberry
-from sqlalchemy.orm import Session
 from strawberry.types import Info
 
+from app.database.database import DbSession, run_sync
 from app.graphql.types.email import EmailResponseType
 from app.graphql.types.user import LoginInput, LoginType, RegisterInput, UserType
 from app.middleware.validators.email_validation import EmailResponse as EmailResponseInternal
@@ -22,25 +22,25 @@ class UserMutation:
     """
 
     @strawberry.field
-    def login(self, info: Info[ContextType, None], login_data: LoginInput) -> LoginType:  # noqa: PLR6301
+    async def login(self, info: Info[ContextType, None], login_data: LoginInput) -> LoginType:  # noqa: PLR6301
         """Attempts to log in a user and returns a token."""
 
-        db: Session = info.context.get('db')
+        db: DbSession = info.context.get('db')
 
         if not db:
             raise ValueError('Sessão do banco de dados não encontrada.')
 
         try:
-            login = AuthenticationService.login(db, login_data)
+            login = await run_sync(db, AuthenticationService.login, login_data)
             return login
         except ValueError as e:
             raise ValueError(f'Erro ao processar o login: {e}') from e
 
     @strawberry.field
-    def register(self, info: Info[ContextType, None], register_data: RegisterInput) -> UserType:  # noqa: PLR6301
+    async def register(self, info: Info[ContextType, None], register_data: RegisterInput) -> UserType:  # noqa: PLR6301
         """Attempts to register a new user."""
 
-        db: Session = info.context.get('db')
+        db: DbSession = info.context.get('db')
 
         if not db:
             raise ValueError('Sessão do banco de dados não encontrada.')
@@ -52,7 +52,7 @@ class UserMutation:
             raise ValueError(to_graphql_response(email_validation))
 
         try:
-            register = AuthenticationService.register(db, register_data)
+            register = await run_sync(db, AuthenticationService.register, register_data)
             return register
         except ValueError as e:
             raise ValueError(f'Erro ao processar o registro: {e}') from e
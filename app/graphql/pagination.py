@@ -0,0 +1,164 @@
+import base64
+import binascii
+import decimal
+import json
+from typing import Any, List, Optional, Sequence, Tuple
+
+from sqlalchemy import ColumnElement, Select, and_, func, or_
+from sqlalchemy.orm import InstrumentedAttribute
+from sqlalchemy.orm.interfaces import ORMOption
+
+from app.core.settings import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from app.database.database import DbSession, execute
+from app.graphql.types.pagination import Connection, Edge, PageInfo
+
+# Path of the nodes in the selection of a connection field
+NODE_PATH = ('edges', 'node')
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Opaque cursor holding the key values of a row."""
+    return base64.urlsafe_b64encode(
+        json.dumps(list(values), separators=(',', ':'), default=_cursor_value).encode()
+    ).decode()
+
+
+def _cursor_value(value: Any) -> Any:
+    # ROWID keys are Numeric(38, 0)
+    if isinstance(value, decimal.Decimal) and value == value.to_integral_value():
+        return int(value)
+    raise TypeError(f'{type(value).__name__} cannot be held by a cursor.')
+
+
+def decode_cursor(cursor: str, size: int) -> List[Any]:
+    """Key values held by a cursor; `size` is the number of keys of the connection."""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (ValueError, binascii.Error) as e:
+        raise ValueError('Invalid cursor.') from e
+
+    if not isinstance(values, list) or len(values) != size:
+        raise ValueError('Invalid cursor.')
+
+    return values
+
+
+def keyset_predicate(
+    keys: Sequence[InstrumentedAttribute], values: Sequence[Any], forward: bool = True
+) -> ColumnElement[bool]:
+    """
+    Rows after (or before) `values` in the order of `keys`.
+    SQL Server has no row value comparison, so (a, b) > (x, y) is written
+    a > x OR (a = x AND b > y), which still seeks the index on (a, b).
+    """
+    clauses = []
+    for i, key in enumerate(keys):
+        equal = [previous == value for previous, value in zip(keys[:i], values[:i])]
+        clauses.append(and_(*equal, key > values[i] if forward else key < values[i]))
+    return or_(*clauses)
+
+
+async def paginate(  # noqa: PLR0913, PLR0917
+    db: DbSession,
+    stmt: Select,
+    keys: Sequence[InstrumentedAttribute],
+    options: Sequence[ORMOption] = (),
+    first: Optional[int] = None,
+    after: Optional[str] = None,
+    last: Optional[int] = None,
+    before: Optional[str] = None,
+) -> Connection:
+    """
+    Run `stmt` as one page of a Relay connection, loading the rows with `options`.
+    The rows are ordered by `keys`, which must be unique (the columns of a unique index)
+    and loaded by the options. Pages are sought from the cursor values, never with OFFSET.
+    """
+    forward, size = _page_size(first, last)
+    count = stmt.with_only_columns(func.count(), maintain_column_froms=True)
+
+    if after:
+        stmt = stmt.where(keyset_predicate(keys, decode_cursor(after, len(keys)), forward=True))
+    if before:
+        stmt = stmt.where(keyset_predicate(keys, decode_cursor(before, len(keys)), forward=False))
+
+    # one row more than the page tells whether another page follows
+    order = list(keys) if forward else [key.desc() for key in keys]
+    result = await execute(db, stmt.options(*options).order_by(*order).limit(size + 1))
+    rows = result.scalars().all()
+
+    return _connection(rows, [key.key for key in keys], size, forward, after, before, count_statement=count)
+
+
+def paginate_records(  # noqa: PLR0913, PLR0917
+    records: Sequence[Any],
+    keys: Sequence[str],
+    first: Optional[int] = None,
+    after: Optional[str] = None,
+    last: Optional[int] = None,
+    before: Optional[str] = None,
+) -> Connection:
+    """
+    One page of a Relay connection over records already in memory, ordered by the attributes `keys`.
+    The cursors hold the same key values as the cursors of paginate, so both are interchangeable.
+    """
+    forward, size = _page_size(first, last)
+
+    def key(record: Any) -> Tuple[Any, ...]:
+        return tuple(getattr(record, name) for name in keys)
+
+    rows = sorted(records, key=key)
+    count = len(rows)
+
+    if after:
+        values = tuple(decode_cursor(after, len(keys)))
+        rows = [row for row in rows if key(row) > values]
+    if before:
+        values = tuple(decode_cursor(before, len(keys)))
+        rows = [row for row in rows if key(row) < values]
+
+    rows = rows[: size + 1] if forward else rows[::-1][: size + 1]
+    return _connection(rows, keys, size, forward, after, before, count=count)
+
+
+def _page_size(first: Optional[int], last: Optional[int]) -> Tuple[bool, int]:
+    """The direction (forward unless `last` is given) and the size of the page."""
+    if first is not None and last is not None:
+        raise ValueError('Use either first or last, not both.')
+
+    forward = last is None
+    requested = first if forward else last
+    size = DEFAULT_PAGE_SIZE if requested is None else requested
+    if not 0 <= size <= MAX_PAGE_SIZE:
+        raise ValueError(f'Page size must be between 0 and {MAX_PAGE_SIZE}.')
+
+    return forward, size
+
+
+def _connection(  # noqa: PLR0913, PLR0917
+    rows: List[Any],
+    keys: Sequence[str],
+    size: int,
+    forward: bool,
+    after: Optional[str],
+    before: Optional[str],
+    count_statement: Optional[Select] = None,
+    count: Optional[int] = None,
+) -> Connection:
+    # `rows` holds one row more than the page when another page follows, in the order of the direction
+    has_more = len(rows) > size
+    rows = rows[:size]
+    if not forward:
+        rows.reverse()
+
+    edges = [Edge(node=row, cursor=encode_cursor([getattr(row, key) for key in keys])) for row in rows]
+    return Connection(
+        edges=edges,
+        pageInfo=PageInfo(
+            hasNextPage=has_more if forward else before is not None,
+            hasPreviousPage=has_more if not forward else after is not None,
+            startCursor=edges[0].cursor if edges else None,
+            endCursor=edges[-1].cursor if edges else None,
+        ),
+        countStatement=count_statement,
+        count=count,
+    )
@@ -0,0 +1,182 @@
+import asyncio
+import contextlib
+import logging
+from typing import Any, AsyncIterator, Dict, Optional, Sequence, Set, Tuple, Type
+
+from graphql import GraphQLError
+from sqlalchemy import select
+from sqlalchemy.orm.interfaces import ORMOption
+
+from app.core.settings import MAX_PAGE_SIZE, SUBSCRIPTION_POLL_SECONDS, SUBSCRIPTION_QUEUE_SIZE
+from app.database.database import REPLICA, DbSession, LazySession, db, execute, route_session, select_folder
+from app.graphql.changes import changes, latest_watermark
+from app.graphql.loaders.address import address_loader
+from app.middleware.auth.permissions import IsAuthenticated, context_authenticated
+
+logger = logging.getLogger(__name__)
+
+
+class SubscriptionOverflow(RuntimeError):
+    """A subscriber fell more than SUBSCRIPTION_QUEUE_SIZE changes behind its poller."""
+
+
+class Subscriber:
+    """The changes a poller sent to one subscription, until it reads them."""
+
+    def __init__(self):
+        self.queue: 'asyncio.Queue[Any]' = asyncio.Queue(maxsize=SUBSCRIPTION_QUEUE_SIZE)
+        self.overflowed = False
+
+    async def next(self) -> Any:
+        if self.overflowed and self.queue.empty():
+            raise SubscriptionOverflow('Subscription fell behind the changes, subscribe again.')
+        return await self.queue.get()
+
+
+class PollerRun:
+    """
+    The state of one run of a poller, from its first subscriber to its last. A poll left running
+    when its run stops (see TablePoller.run) no longer publishes, nor moves the watermark of the next run.
+    """
+
+    def __init__(self):
+        self.watermark: Optional[str] = None
+        self.stopped = False
+
+
+class TablePoller:
+    """
+    Polls one table of one folder for changes (UPDDATTIM_0, see changes) and fans the changed
+    rows out to every subscriber: one query per SUBSCRIPTION_POLL_SECONDS, whatever their number.
+    Runs while it has subscribers, from the latest change at the time the first one subscribed.
+    """
+
+    def __init__(self, model: Type[Any], folder: str, options: Sequence[ORMOption] = ()):
+        self.model = model
+        self.folder = folder
+        # loader options of the rows sent, detached from their session once the poll is done
+        self.options = options
+        self.subscribers: Set[Subscriber] = set()
+        self.current: Optional[PollerRun] = None
+        self.task: Optional['asyncio.Task[None]'] = None
+        self.polls = 0
+
+    @contextlib.asynccontextmanager
+    async def subscribe(self) -> AsyncIterator[Subscriber]:
+        subscriber = Subscriber()
+        self.subscribers.add(subscriber)
+        if self.task is None:
+            self.current = PollerRun()
+            self.task = asyncio.create_task(self.run(self.current))
+        try:
+            yield subscriber
+        finally:
+            self.subscribers.discard(subscriber)
+            if not self.subscribers and self.task is not None:
+                self.current.stopped = True
+                self.task.cancel()
+                self.task, self.current = None, None
+
+    async def run(self, run: PollerRun) -> None:
+        """Poll every SUBSCRIPTION_POLL_SECONDS, until cancelled."""
+        while True:
+            try:
+                # a poll cancelled midway would close its session while the executor still runs its statement
+                await asyncio.shield(self.poll(run))
+            except Exception:
+                # the next poll starts again from the same watermark
+                logger.exception('Polling %s for changes failed', self.model.__tablename__)
+            await asyncio.sleep(SUBSCRIPTION_POLL_SECONDS)
+
+    async def poll(self, run: PollerRun) -> None:
+        session = LazySession(db.SessionLocal)
+        route_session(session, REPLICA)
+        select_folder(session, self.folder)
+        try:
+            if run.watermark is None:
+                run.watermark = await latest_watermark(session, self.model)
+                return
+
+            has_more = True
+            while has_more and not run.stopped:
+                feed = await changes(
+                    session, select(self.model), self.model, self.options, after=run.watermark, first=MAX_PAGE_SIZE
+                )
+                # the subscribers are those of the next run once this one has stopped
+                if run.stopped:
+                    break
+                self.publish(feed.nodes)
+                run.watermark, has_more = feed.watermark, feed.hasMore
+        finally:
+            await session.close()
+            self.polls += 1
+
+    def publish(self, rows: Sequence[Any]) -> None:
+        for subscriber in list(self.subscribers):
+            for row in rows:
+                try:
+                    subscriber.queue.put_nowait(row)
+                except asyncio.QueueFull:
+                    # it reads what it was sent, then its subscription ends
+                    subscriber.overflowed = True
+                    self.subscribers.discard(subscriber)
+                    break
+
+    def statistics(self) -> Dict[str, Any]:
+        return {'subscribers': len(self.subscribers), 'polls': self.polls, 'running': self.task is not None}
+
+
+_pollers: Dict[Tuple[str, str], TablePoller] = {}
+
+
+def table_poller(model: Type[Any], folder: str, options: Sequence[ORMOption] = ()) -> TablePoller:
+    """The poller of the table of `model` in `folder`, shared by all the subscriptions of the process."""
+    key = (model.__tablename__, folder.upper())
+    if key not in _pollers:
+        _pollers[key] = TablePoller(model, folder, options)
+    return _pollers[key]
+
+
+async def changed_rows(context: Dict[str, Any], poller: TablePoller) -> AsyncIterator[Any]:
+    """
+    The rows changed from now on, as sent by `poller`, for a subscription resolver.
+    Each row is resolved with a session and an address loader of its own, set in the context of
+    the subscription (see SubscriptionContext) and closed before the next change. The stream
+    ends as soon as the token of the connection is no longer valid.
+    """
+    # the route and folder the operation selected for the session of the connection
+    settings = {key: context['db'].info[key] for key in ('route', 'folder') if key in context['db'].info}
+
+    async with poller.subscribe() as subscriber:
+        while True:
+            row = await subscriber.next()
+            if not context_authenticated(context):
+                raise GraphQLError(IsAuthenticated.message)
+
+            session = _event_session(settings)
+            context['db'], context['address_loader'] = session, address_loader(session)
+            try:
+                yield row
+            finally:
+                # the fields of the row are resolved: nothing is held until the next change
+                await session.close()
+
+
+async def current_row(db: DbSession, row: Any, options: Sequence[ORMOption]) -> Optional[Any]:
+    """
+    `row`, as sent by a poller, read again in the session of its change with the loader options of
+    the subscription (e.g. the relationships it selects). None when the row was deleted since.
+    """
+    model = type(row)
+    result = await execute(db, select(model).where(model.id == row.id).options(*options))
+    return result.scalars().first()
+
+
+def _event_session(settings: Dict[str, Any]) -> DbSession:
+    session = LazySession(db.SessionLocal)
+    session.info.update(settings)
+    return session
+
+
+def statistics() -> Dict[str, Any]:
+    return {f'{folder}.{table}': poller.statistics() for (table, folder), poller in _pollers.items()}
@@ -1,11 +1,19 @@
-from typing import List
+import datetime
+from typing import List, Optional
 
 import strawberry
 from sqlalchemy import select
-from sqlalchemy.orm import Session
 from strawberry.types import Info
 
+from app.database.database import DbSession, execute
+from app.graphql.aggregates import count_by
+from app.graphql.changes import FEED_PATH, changes
+from app.graphql.pagination import NODE_PATH, paginate
+from app.graphql.selection import load_options
 from app.graphql.types.address import Address as AddressType
+from app.graphql.types.address import AddressGroupBy
+from app.graphql.types.aggregate import GroupCount
+from app.graphql.types.pagination import ChangeFeed, Connection
 from app.middleware.auth.permissions import IsAuthenticated
 from app.models.address import Address as AddressModel
 
@@ -15,15 +23,19 @@ ContextType = dict
 @strawberry.type
 class AddressQuery:
     @strawberry.field(permission_classes=[IsAuthenticated])
-    def addresses_by_entity(  # noqa: PLR6301
+    async def addresses_by_entity(  # noqa: PLR6301
         self, info: Info[ContextType, None], entity_number: str
     ) -> List[AddressType]:
         """Busca todos os endereços associados a um número de entidade."""
-        db: Session = info.context['db']
+        db: DbSession = info.context['db']
 
-        stmt = select(AddressModel).where(AddressModel.entityNumber == entity_number)
+        stmt = (
+            select(AddressModel)
+            .options(*load_options(info, AddressModel, AddressType))
+            .where(AddressModel.entityNumber == entity_number)
+        )
 
-        result = db.execute(stmt)
+        result = await execute(db, stmt)
 
         db_addresses = result.scalars().all()
 
@@ -31,3 +43,58 @@ class AddressQuery:
             return []
 
         return db_addresses
+
+    @strawberry.field(permission_classes=[IsAuthenticated])
+    async def addresses(  # noqa: PLR0913, PLR0917, PLR6301
+        self,
+        info: Info[ContextType, None],
+        entity_type: Optional[int] = None,
+        first: Optional[int] = None,
+        after: Optional[str] = None,
+        last: Optional[int] = None,
+        before: Optional[str] = None,
+    ) -> Connection[AddressType]:
+        """Fetches a page of addresses, in entity type, entity number and code order (BPADDRESS_BPA0)."""
+        db: DbSession = info.context['db']
+
+        keys = (AddressModel.entityType, AddressModel.entityNumber, AddressModel.code)
+        options = load_options(
+            info, AddressModel, AddressType, path=NODE_PATH, required=('entityType', 'entityNumber', 'code')
+        )
+        stmt = select(AddressModel)
+        if entity_type is not None:
+            stmt = stmt.where(AddressModel.entityType == entity_type)
+
+        return await paginate(db, stmt, keys, options, first=first, after=after, last=last, before=before)
+
+    @strawberry.field(permission_classes=[IsAuthenticated])
+    async def addresses_changed_since(  # noqa: PLR6301
+        self,
+        info: Info[ContextType, None],
+        entity_type: Optional[int] = None,
+        since: Optional[datetime.datetime] = None,
+        after: Optional[str] = None,
+        first: Optional[int] = None,
+    ) -> ChangeFeed[AddressType]:
+        """Fetches the addresses changed since a date or after a watermark, in change order (BPADDRESS_ZUPD0)."""
+        db: DbSession = info.context['db']
+
+        options = load_options(info, AddressModel, AddressType, path=FEED_PATH, required=('updateDatetime',))
+        stmt = select(AddressModel)
+        if entity_type is not None:
+            stmt = stmt.where(AddressModel.entityType == entity_type)
+
+        return await changes(db, stmt, AddressModel, options, since=since, after=after, first=first)
+
+    @strawberry.field(permission_classes=[IsAuthenticated])
+    async def address_groups(  # noqa: PLR6301
+        self, info: Info[ContextType, None], by: AddressGroupBy, entity_type: Optional[int] = None
+    ) -> List[GroupCount]:
+        """Counts the addresses per country or entity type, without loading them."""
+        db: DbSession = info.context['db']
+
+        stmt = select(AddressModel)
+        if entity_type is not None:
+            stmt = stmt.where(AddressModel.entityType == entity_type)
+
+        return await count_by(db, stmt, getattr(AddressModel, by.value))
@@ -1,45 +1,132 @@
-from typing import List, Optional
+from typing import Any, Callable, List, Optional, Tuple
 
 import strawberry
+from sqlalchemy import ColumnElement
 from sqlalchemy.future import select
-from sqlalchemy.orm import Session
 from strawberry.types import Info
 
+from app.database.database import DbSession, execute
+from app.graphql.filters import apply_filter, starts_with
+from app.graphql.lookups import check_keys, lookup
+from app.graphql.pagination import NODE_PATH, paginate, paginate_records
+from app.graphql.response_cache import REFERENCE_SOURCES
+from app.graphql.selection import load_options
 from app.graphql.types.company import Company as CompanyType
+from app.graphql.types.company import CompanyFilter, CompanyOrder
+from app.graphql.types.pagination import Connection
 from app.middleware.auth.permissions import IsAuthenticated
 from app.models.corporation import Company as CompanyModel
+from app.services.reference_data import reference_data
 
 ContextType = dict
 
+# Orders an index can serve: CPY0 and CPY1
+COMPANY_ORDERS = {
+    CompanyOrder.CODE: (CompanyModel.company,),
+    CompanyOrder.LEGISLATION: (CompanyModel.legislation, CompanyModel.company),
+}
+
+
+def company_predicates(where: CompanyFilter) -> Tuple[List[ColumnElement[bool]], List[ColumnElement[bool]]]:
+    """The indexed (CPY0, CPY1) and residual predicates of a company filter."""
+    indexed, residual = [], []
+
+    if where.codePrefix:
+        indexed.append(starts_with(CompanyModel.company, where.codePrefix))
+    if where.legislation is not None:
+        indexed.append(CompanyModel.legislation == where.legislation)
+    if where.country is not None:
+        residual.append(CompanyModel.country == where.country)
+
+    return indexed, residual
+
+
+def company_matches(where: CompanyFilter) -> Callable[[Any], bool]:
+    """The company filter, applied to the companies of the reference data."""
+
+    def matches(company: Any) -> bool:
+        return (
+            (not where.codePrefix or company.company.startswith(where.codePrefix))
+            and (where.legislation is None or company.legislation == where.legislation)
+            and (where.country is None or company.country == where.country)
+        )
+
+    return matches
+
 
 @strawberry.type
 class CompanyQuery:
-    @strawberry.field(permission_classes=[IsAuthenticated])
-    def companies(self, info: Info[ContextType, None]) -> List[CompanyType]:  # noqa: PLR6301
-        """Fetches all companies with their associated addresses."""
-        db: Session = info.context['db']
+    @strawberry.field(permission_classes=[IsAuthenticated], metadata={'cache_sources': REFERENCE_SOURCES})
+    async def companies(  # noqa: PLR0913, PLR0917, PLR6301
+        self,
+        info: Info[ContextType, None],
+        where: Optional[CompanyFilter] = None,
+        order_by: CompanyOrder = CompanyOrder.CODE,
+        first: Optional[int] = None,
+        after: Optional[str] = None,
+        last: Optional[int] = None,
+        before: Optional[str] = None,
+    ) -> Connection[CompanyType]:
+        """Fetches a page of companies, filtered and in one of the orders the indexes serve."""
+        db: DbSession = info.context['db']
 
-        stmt = select(CompanyModel).order_by(CompanyModel.company)
-        result = db.execute(stmt)
-        companies_db = result.scalars().unique().all()
+        keys = COMPANY_ORDERS[order_by]
 
-        if not companies_db:
-            return []
+        data = reference_data(info.context)
+        if data is not None:
+            companies = data.companies.values()
+            if where is not None:
+                companies = filter(company_matches(where), companies)
+            names = [key.key for key in keys]
+            return paginate_records(list(companies), names, first=first, after=after, last=last, before=before)
 
-        return companies_db
+        options = load_options(info, CompanyModel, CompanyType, path=NODE_PATH, required=tuple(key.key for key in keys))
+        stmt = select(CompanyModel)
+        if where is not None:
+            # COMPANY is a small reference table, a scan is accepted
+            stmt = apply_filter(
+                info, stmt, *company_predicates(where), hint='codePrefix or legislation', allow_scan=True
+            )
 
-    @strawberry.field(permission_classes=[IsAuthenticated])
-    def company(self, info: Info[ContextType, None], company: str) -> Optional[CompanyType]:  # noqa: PLR6301
+        return await paginate(db, stmt, keys, options, first=first, after=after, last=last, before=before)
+
+    @strawberry.field(permission_classes=[IsAuthenticated], metadata={'cache_sources': REFERENCE_SOURCES})
+    async def company(self, info: Info[ContextType, None], company: str) -> Optional[CompanyType]:  # noqa: PLR6301
         """Fetches a single company by its company, including addresses."""
+        data = reference_data(info.context)
+        if data is not None:
+            return data.companies.get(company)
 
-        db: Session = info.context['db']
+        db: DbSession = info.context['db']
 
-        stmt = select(CompanyModel).where(CompanyModel.company == company)
+        stmt = (
+            select(CompanyModel)
+            .options(*load_options(info, CompanyModel, CompanyType))
+            .where(CompanyModel.company == company)
+        )
 
-        result = db.execute(stmt)
+        result = await execute(db, stmt)
         company_db = result.scalars().unique().one_or_none()
 
         if not company_db:
             return None
 
         return company_db
+
+    @strawberry.field(
+        permission_classes=[IsAuthenticated], metadata={'cache_sources': REFERENCE_SOURCES, 'size_argument': 'codes'}
+    )
+    async def companies_by_codes(  # noqa: PLR6301
+        self, info: Info[ContextType, None], codes: List[str]
+    ) -> List[Optional[CompanyType]]:
+        """Fetches the companies of a list of codes, in the order of the codes, with null for the unknown ones."""
+        check_keys(codes)
+
+        data = reference_data(info.context)
+        if data is not None:
+            return [data.companies.get(code) for code in codes]
+
+        db: DbSession = info.context['db']
+
+        options = load_options(info, CompanyModel, CompanyType, required=('company',))
+        return await lookup(db, select(CompanyModel), CompanyModel.company, codes, options)
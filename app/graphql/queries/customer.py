@@ -1,44 +1,137 @@
-from typing import List, Optional
+import datetime
+from typing import List, Optional, Tuple
 
 import strawberry
+from sqlalchemy import ColumnElement
 from sqlalchemy.future import select
-from sqlalchemy.orm import Session
 from strawberry.types import Info
 
+from app.database.database import DbSession, execute
+from app.graphql.aggregates import count_by
+from app.graphql.changes import FEED_PATH, changes
+from app.graphql.filters import apply_filter, starts_with
+from app.graphql.lookups import lookup
+from app.graphql.pagination import NODE_PATH, paginate
+from app.graphql.selection import load_options
+from app.graphql.types.aggregate import GroupCount
 from app.graphql.types.customer import Customer as CustomerType
+from app.graphql.types.customer import CustomerFilter, CustomerGroupBy, CustomerOrder
+from app.graphql.types.pagination import ChangeFeed, Connection
 from app.middleware.auth.permissions import IsAuthenticated
 from app.models.customer import Customer as CustomerModel
 
 ContextType = dict
 
+# Orders an index can serve: BPC0, BPC1 and ZBPC0. BPC1 is not unique: its rows are ordered by the
+# clustered key (ROWID) within a name, which makes the order total without sorting
+CUSTOMER_ORDERS = {
+    CustomerOrder.CODE: (CustomerModel.customerCode,),
+    CustomerOrder.NAME: (CustomerModel.companyName, CustomerModel.id),
+    CustomerOrder.COUNTRY: (CustomerModel.countryExport, CustomerModel.companyName, CustomerModel.customerCode),
+}
+
+
+def customer_predicates(where: CustomerFilter) -> Tuple[List[ColumnElement[bool]], List[ColumnElement[bool]]]:
+    """The indexed (BPC0, BPC1, ZBPC0) and residual predicates of a customer filter."""
+    indexed, residual = [], []
+
+    if where.codePrefix:
+        indexed.append(starts_with(CustomerModel.customerCode, where.codePrefix))
+    if where.namePrefix:
+        indexed.append(starts_with(CustomerModel.companyName, where.namePrefix))
+    if where.country is not None:
+        indexed.append(CustomerModel.countryExport == where.country)
+    if where.isActive is not None:
+        residual.append(CustomerModel.isActive == where.isActive)
+    if where.currency is not None:
+        residual.append(CustomerModel.currency == where.currency)
+    if where.category is not None:
+        residual.append(CustomerModel.category == where.category)
+
+    return indexed, residual
+
 
 @strawberry.type
 class CustomerQuery:
     @strawberry.field(permission_classes=[IsAuthenticated])
-    def customers(self, info: Info[ContextType, None]) -> List[CustomerType]:  # noqa: PLR6301
-        """Fetches all customers with their associated addresses."""
-        db: Session = info.context['db']
-
-        stmt = select(CustomerModel).order_by(CustomerModel.customerCode)
-        result = db.execute(stmt)
-        customers_db = result.scalars().unique().all()
+    async def customers(  # noqa: PLR0913, PLR0917, PLR6301
+        self,
+        info: Info[ContextType, None],
+        where: Optional[CustomerFilter] = None,
+        order_by: CustomerOrder = CustomerOrder.CODE,
+        first: Optional[int] = None,
+        after: Optional[str] = None,
+        last: Optional[int] = None,
+        before: Optional[str] = None,
+    ) -> Connection[CustomerType]:
+        """Fetches a page of customers, filtered and in one of the orders the indexes serve."""
+        db: DbSession = info.context['db']
 
-        if not customers_db:
-            return []
+        keys = CUSTOMER_ORDERS[order_by]
+        options = load_options(
+            info, CustomerModel, CustomerType, path=NODE_PATH, required=tuple(key.key for key in keys)
+        )
+        stmt = select(CustomerModel)
+        if where is not None:
+            stmt = apply_filter(info, stmt, *customer_predicates(where), hint='codePrefix, namePrefix or country')
 
-        return customers_db
+        return await paginate(db, stmt, keys, options, first=first, after=after, last=last, before=before)
 
     @strawberry.field(permission_classes=[IsAuthenticated])
-    def customer(self, info: Info[ContextType, None], code: str) -> Optional[CustomerType]:  # noqa: PLR6301
+    async def customer(self, info: Info[ContextType, None], code: str) -> Optional[CustomerType]:  # noqa: PLR6301
         """Fetches a single customer by its code, including addresses."""
-        db: Session = info.context['db']
+        db: DbSession = info.context['db']
 
-        stmt = select(CustomerModel).where(CustomerModel.customerCode == code)
+        stmt = (
+            select(CustomerModel)
+            .options(*load_options(info, CustomerModel, CustomerType))
+            .where(CustomerModel.customerCode == code)
+        )
 
-        result = db.execute(stmt)
+        result = await execute(db, stmt)
         customer_db = result.scalars().unique().one_or_none()
 
         if not customer_db:
             return None
 
         return customer_db
+
+    @strawberry.field(permission_classes=[IsAuthenticated], metadata={'size_argument': 'codes'})
+    async def customers_by_codes(  # noqa: PLR6301
+        self, info: Info[ContextType, None], codes: List[str]
+    ) -> List[Optional[CustomerType]]:
+        """Fetches the customers of a list of codes, in the order of the codes, with null for the unknown ones."""
+        db: DbSession = info.context['db']
+
+        options = load_options(info, CustomerModel, CustomerType, required=('customerCode',))
+        return await lookup(db, select(CustomerModel), CustomerModel.customerCode, codes, options)
+
+    @strawberry.field(permission_classes=[IsAuthenticated])
+    async def customers_changed_since(  # noqa: PLR6301
+        self,
+        info: Info[ContextType, None],
+        since: Optional[datetime.datetime] = None,
+        after: Optional[str] = None,
+        first: Optional[int] = None,
+    ) -> ChangeFeed[CustomerType]:
+        """Fetches the customers changed since a date or after a watermark, in change order (BPCUSTOMER_ZUPD0)."""
+        db: DbSession = info.context['db']
+
+        options = load_options(info, CustomerModel, CustomerType, path=FEED_PATH, required=('updateDatetime',))
+        return await changes(db, select(CustomerModel), CustomerModel, options, since=since, after=after, first=first)
+
+    @strawberry.field(permission_classes=[IsAuthenticated])
+    async def customer_groups(  # noqa: PLR6301
+        self, info: Info[ContextType, None], by: CustomerGroupBy, where: Optional[CustomerFilter] = None
+    ) -> List[GroupCount]:
+        """Counts the customers per currency, category or status, without loading them."""
+        db: DbSession = info.context['db']
+
+        stmt = select(CustomerModel)
+        if where is not None:
+            # the grouping reads the whole (filtered) table anyway
+            stmt = apply_filter(
+                info, stmt, *customer_predicates(where), hint='codePrefix, namePrefix or country', allow_scan=True
+            )
+
+        return await count_by(db, stmt, getattr(CustomerModel, by.value))
@@ -1,41 +1,107 @@
-from typing import List, Optional
+from typing import Any, Callable, List, Optional, Tuple
 
 import strawberry
+from sqlalchemy import ColumnElement
 from sqlalchemy.future import select
-from sqlalchemy.orm import Session
 from strawberry.types import Info
 
+from app.database.database import DbSession, execute
+from app.graphql.filters import apply_filter, starts_with
+from app.graphql.pagination import NODE_PATH, paginate, paginate_records
+from app.graphql.response_cache import REFERENCE_SOURCES
+from app.graphql.selection import load_options
+from app.graphql.types.pagination import Connection
 from app.graphql.types.site import Site as SiteType
+from app.graphql.types.site import SiteFilter, SiteOrder
 from app.middleware.auth.permissions import IsAuthenticated
 from app.models.corporation import Sites as SitesModel
+from app.services.reference_data import reference_data
 
 ContextType = dict
 
+# Orders an index can serve: FCY0 and FCY1
+SITE_ORDERS = {
+    SiteOrder.CODE: (SitesModel.code,),
+    SiteOrder.LEGAL_COMPANY: (SitesModel.legalCompany, SitesModel.code),
+}
+
+
+def site_predicates(where: SiteFilter) -> Tuple[List[ColumnElement[bool]], List[ColumnElement[bool]]]:
+    """The indexed (FCY0, FCY1) and residual predicates of a site filter."""
+    indexed, residual = [], []
+
+    if where.codePrefix:
+        indexed.append(starts_with(SitesModel.code, where.codePrefix))
+    if where.legalCompany is not None:
+        indexed.append(SitesModel.legalCompany == where.legalCompany)
+    if where.legislation is not None:
+        residual.append(SitesModel.legislation == where.legislation)
+    if where.country is not None:
+        residual.append(SitesModel.country == where.country)
+
+    return indexed, residual
+
+
+def site_matches(where: SiteFilter) -> Callable[[Any], bool]:
+    """The site filter, applied to the sites of the reference data."""
+
+    def matches(site: Any) -> bool:
+        return (
+            (not where.codePrefix or site.code.startswith(where.codePrefix))
+            and (where.legalCompany is None or site.legalCompany == where.legalCompany)
+            and (where.legislation is None or site.legislation == where.legislation)
+            and (where.country is None or site.country == where.country)
+        )
+
+    return matches
+
 
 @strawberry.type
 class SiteQuery:
-    @strawberry.field(permission_classes=[IsAuthenticated])
-    def sites(self, info: Info[ContextType, None]) -> List[SiteType]:  # noqa: PLR6301
-        """Fetches all sites with their associated addresses."""
-        db: Session = info.context['db']
+    @strawberry.field(permission_classes=[IsAuthenticated], metadata={'cache_sources': REFERENCE_SOURCES})
+    async def sites(  # noqa: PLR0913, PLR0917, PLR6301
+        self,
+        info: Info[ContextType, None],
+        where: Optional[SiteFilter] = None,
+        order_by: SiteOrder = SiteOrder.CODE,
+        first: Optional[int] = None,
+        after: Optional[str] = None,
+        last: Optional[int] = None,
+        before: Optional[str] = None,
+    ) -> Connection[SiteType]:
+        """Fetches a page of sites, filtered and in one of the orders the indexes serve."""
+        db: DbSession = info.context['db']
 
-        stmt = select(SitesModel)
-        result = db.execute(stmt)
-        sites_db = result.scalars().unique().all()
+        keys = SITE_ORDERS[order_by]
 
-        if not sites_db:
-            return []
+        data = reference_data(info.context)
+        if data is not None:
+            sites = data.sites.values()
+            if where is not None:
+                sites = filter(site_matches(where), sites)
+            names = [key.key for key in keys]
+            return paginate_records(list(sites), names, first=first, after=after, last=last, before=before)
 
-        return sites_db
+        options = load_options(info, SitesModel, SiteType, path=NODE_PATH, required=tuple(key.key for key in keys))
+        stmt = select(SitesModel)
+        if where is not None:
+            # FACILITY is a small reference table, a scan is accepted
+            stmt = apply_filter(info, stmt, *site_predicates(where), hint='codePrefix or legalCompany', allow_scan=True)
+
+        return await paginate(db, stmt, keys, options, first=first, after=after, last=last, before=before)
 
-    @strawberry.field(permission_classes=[IsAuthenticated])
-    def site(self, info: Info[ContextType, None], code: str) -> Optional[SiteType]:  # noqa: PLR6301
+    @strawberry.field(permission_classes=[IsAuthenticated], metadata={'cache_sources': REFERENCE_SOURCES})
+    async def site(self, info: Info[ContextType, None], code: str) -> Optional[SiteType]:  # noqa: PLR6301
         """Fetches a single site by its code, including addresses."""
-        db: Session = info.context['db']
+        data = reference_data(info.context)
+        if data is not None:
+            return data.sites.get(code)
+
+        db: DbSession = info.context['db']
 
-        stmt = select(SitesModel).where(SitesModel.code == code)
+        stmt = select(SitesModel).options(*load_options(info, SitesModel, SiteType)).where(SitesModel.code == code)
 
-        result = db.execute(stmt)
+        result = await execute(db, stmt)
         site_db = result.scalars().unique().one_or_none()
 
         if not site_db:
@@ -0,0 +1,112 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, NamedTuple, Optional, Tuple
+
+from sqlalchemy import Select, func, select
+
+from app.core.local_menus import Chapter601
+from app.core.settings import DB_FOLDERS, RESPONSE_CACHE_MAX_AGE, RESPONSE_CACHE_SIZE
+from app.database.database import REPLICA, LazySession, db, execute, route_session, select_folder
+from app.models.address import Address
+from app.models.corporation import Company, Sites
+
+logger = logging.getLogger(__name__)
+
+# Rows read by the reference-data fields, polled for changes: any insert, update or delete
+# changes their MAX(UPDDATTIM_0), SUM(UPDTICK_0) or COUNT(*)
+SOURCES: Dict[str, Callable[[], Select]] = {
+    'COMPANY': lambda: select(func.max(Company.updateDatetime), func.sum(Company.updateChanges), func.count()),
+    'FACILITY': lambda: select(func.max(Sites.updateDatetime), func.sum(Sites.updateChanges), func.count()),
+    # only the addresses of the companies and sites (seek on BPADDRESS_BPA0)
+    'BPADDRESS': lambda: select(func.max(Address.updateDatetime), func.sum(Address.updateChanges), func.count()).where(
+        Address.entityType.in_((Chapter601.COMPANY, Chapter601.SITE))
+    ),
+}
+
+# Sources of the Company and Site fields, which reach each other and their addresses
+REFERENCE_SOURCES = ('COMPANY', 'FACILITY', 'BPADDRESS')
+
+# (query hash, operation name, variables, folder, generation of the reference data the response is built from)
+CacheKey = Tuple[str, Optional[str], str, str, Optional[int]]
+
+
+class CachedResponse(NamedTuple):
+    data: Dict[str, Any]
+    versions: Dict[str, Tuple[Any, ...]]
+
+
+class ResponseCache:
+    """
+    LRU of the responses of the cacheable queries, per folder.
+    A response is served while the versions of the sources it was read from are unchanged
+    and were polled less than RESPONSE_CACHE_MAX_AGE seconds ago, so it is never older than that.
+    """
+
+    def __init__(self, maxsize: int = RESPONSE_CACHE_SIZE, max_age: float = RESPONSE_CACHE_MAX_AGE):
+        self.maxsize = maxsize
+        self.max_age = max_age
+        self._responses: 'OrderedDict[CacheKey, CachedResponse]' = OrderedDict()
+        # (folder, source) -> (version, monotonic time of the poll)
+        self._versions: Dict[Tuple[str, str], Tuple[Tuple[Any, ...], float]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def versions(self, folder: str, sources: Tuple[str, ...]) -> Optional[Dict[str, Tuple[Any, ...]]]:
+        """The current versions of `sources`, None when one of them was not polled recently."""
+        now = time.monotonic()
+        versions = {}
+        for source in sources:
+            polled = self._versions.get((folder, source))
+            if polled is None or now - polled[1] > self.max_age:
+                return None
+            versions[source] = polled[0]
+        return versions
+
+    def get(self, key: CacheKey, sources: Tuple[str, ...]) -> Optional[Dict[str, Any]]:
+        cached = self._responses.get(key)
+        if cached is not None and cached.versions == self.versions(key[3], sources):
+            self._responses.move_to_end(key)
+            self.hits += 1
+            return cached.data
+
+        if cached is not None:
+            del self._responses[key]
+        self.misses += 1
+        return None
+
+    def put(self, key: CacheKey, data: Dict[str, Any], versions: Dict[str, Tuple[Any, ...]]) -> None:
+        self._responses[key] = CachedResponse(data, versions)
+        self._responses.move_to_end(key)
+        while len(self._responses) > self.maxsize:
+            self._responses.popitem(last=False)
+
+    async def poll(self) -> None:
+        """Read the versions of every source in every folder, from the replica the cached queries read."""
+        for folder in DB_FOLDERS:
+            session = LazySession(db.SessionLocal)
+            route_session(session, REPLICA)
+            select_folder(session, folder)
+            try:
+                for source, statement in SOURCES.items():
+                    result = await execute(session, statement())
+                    self._versions[folder, source] = (tuple(result.one()), time.monotonic())
+            finally:
+                await session.close()
+
+    async def run(self) -> None:
+        """Poll the sources twice per RESPONSE_CACHE_MAX_AGE, until cancelled."""
+        while True:
+            try:
+                await self.poll()
+            except Exception:
+                # the responses expire once their versions are older than max_age
+                logger.exception('Polling the response cache sources failed')
+            await asyncio.sleep(self.max_age / 2)
+
+    def statistics(self) -> Dict[str, Any]:
+        return {'size': len(self._responses), 'maxsize': self.maxsize, 'hits': self.hits, 'misses': self.misses}
+
+
+response_cache = ResponseCache()
@@ -1,12 +1,21 @@
 import strawberry
 from strawberry.schema import Schema
 
+from app.graphql.extensions.cost import QueryCost
+from app.graphql.extensions.documents import CachedDocuments, CachedIntrospection
+from app.graphql.extensions.resolver_path import ResolverPath
+from app.graphql.extensions.response_cache import ResponseCaching
+from app.graphql.extensions.routing import DatabaseRouting
+from app.graphql.extensions.session import ReleaseSession
+from app.graphql.extensions.subscription import SubscriptionContext
 from app.graphql.mutations.editor import EditorMutation
 from app.graphql.mutations.user import UserMutation
 from app.graphql.queries.address import AddressQuery
 from app.graphql.queries.company import CompanyQuery
 from app.graphql.queries.customer import CustomerQuery
 from app.graphql.queries.site import SiteQuery
+from app.graphql.subscriptions.customer import CustomerSubscription
+from app.graphql.subscriptions.site import SiteSubscription
 
 
 @strawberry.type
@@ -19,4 +28,23 @@ class Mutation(EditorMutation, UserMutation):
     pass
 
 
-schema = Schema(query=Query, mutation=Mutation)
+@strawberry.type
+class Subscription(CustomerSubscription, SiteSubscription):
+    pass
+
+
+schema = Schema(
+    query=Query,
+    mutation=Mutation,
+    subscription=Subscription,
+    extensions=[
+        CachedDocuments,
+        CachedIntrospection,
+        QueryCost,
+        ResponseCaching,
+        DatabaseRouting,
+        SubscriptionContext,
+        ReleaseSession,
+        ResolverPath,
+    ],
+)
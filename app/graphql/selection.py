@@ -0,0 +1,154 @@
+from functools import lru_cache
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Set, Tuple, Type
+
+from sqlalchemy import inspect
+from sqlalchemy.ext.hybrid import hybrid_property
+from sqlalchemy.orm import Load, Mapper, RelationshipProperty, load_only, selectinload
+from sqlalchemy.orm.interfaces import ORMOption
+from strawberry.types import Info
+from strawberry.types.base import StrawberryContainer, StrawberryObjectDefinition
+from strawberry.types.field import StrawberryField
+from strawberry.types.lazy_type import LazyType
+from strawberry.types.nodes import SelectedField, Selection
+from strawberry.utils.str_converters import to_camel_case
+
+# Fields selected at one level of a query: (field name, fields selected below it)
+Shape = FrozenSet[Tuple[str, 'Shape']]
+
+
+def _collect(selections: Iterable[Selection], into: Dict[str, Dict]) -> None:
+    for selection in selections:
+        if isinstance(selection, SelectedField):
+            _collect(selection.selections, into.setdefault(selection.name, {}))
+        else:
+            # fragments add their fields to the level they are spread in
+            _collect(selection.selections, into)
+
+
+def _freeze(fields: Dict[str, Dict]) -> Shape:
+    return frozenset((name, _freeze(children)) for name, children in fields.items())
+
+
+def selection_shape(info: Info, path: Tuple[str, ...] = ()) -> Shape:
+    """
+    The fields selected below the field being resolved, as a hashable tree.
+    `path` descends into the selection first, e.g. ('edges', 'node') for a connection.
+    """
+    fields: Dict[str, Dict] = {}
+    for field in info.selected_fields:
+        _collect(field.selections, fields)
+
+    for name in path:
+        fields = fields.get(name, {})
+    return _freeze(fields)
+
+
+@lru_cache(maxsize=None)
+def _fields_by_name(definition: StrawberryObjectDefinition) -> Dict[str, StrawberryField]:
+    return {field.graphql_name or to_camel_case(field.python_name): field for field in definition.fields}
+
+
+def _attributes(mapper: Mapper, field: StrawberryField) -> Tuple[str, ...]:
+    """The model attributes needed to resolve a field."""
+    # resolvers declare the attributes they read, e.g. metadata={'columns': ('customerCode',)}
+    if 'columns' in field.metadata:
+        return tuple(field.metadata['columns'])
+
+    descriptor = mapper.all_orm_descriptors.get(field.python_name)
+    if descriptor is None:
+        return ()
+
+    if isinstance(descriptor, hybrid_property):
+        return tuple(descriptor.info.get('columns', ()))
+
+    prop = mapper.attrs.get(field.python_name)
+    if isinstance(prop, RelationshipProperty):
+        # the columns the relationship is joined on
+        return tuple(mapper.get_property_by_column(column).key for column in prop.local_columns)
+
+    return (field.python_name,) if prop is not None else ()
+
+
+def _object_definition(field: StrawberryField) -> Optional[StrawberryObjectDefinition]:
+    """The Strawberry type of a field, unwrapped from List, Optional and lazy annotations."""
+    type_ = field.type
+    while isinstance(type_, StrawberryContainer):
+        type_ = type_.of_type
+    if isinstance(type_, LazyType):
+        type_ = type_.resolve_type()
+    return getattr(type_, '__strawberry_definition__', None)
+
+
+def _options(
+    model: Type[Any],
+    definition: StrawberryObjectDefinition,
+    shape: Shape,
+    loader: Optional[Load] = None,
+    required: Tuple[str, ...] = (),
+) -> List[ORMOption]:
+    mapper = inspect(model)
+    fields = _fields_by_name(definition)
+
+    # the primary key is always loaded, the identity map needs it
+    keys: Set[str] = {mapper.get_property_by_column(column).key for column in mapper.primary_key}
+    keys.update(required)
+    options: List[ORMOption] = []
+
+    for name, children in shape:
+        if name not in fields:
+            continue
+
+        field = fields[name]
+        keys.update(_attributes(mapper, field))
+
+        # selected relationships are loaded with one IN query each, the others are never loaded;
+        # fields with a resolver of their own (e.g. the DataLoader backed addresses) load their data themselves
+        prop = mapper.attrs.get(field.python_name)
+        child_definition = _object_definition(field)
+        if isinstance(prop, RelationshipProperty) and field.base_resolver is None and child_definition is not None:
+            attribute = getattr(model, prop.key)
+            child_loader = loader.selectinload(attribute) if loader is not None else selectinload(attribute)
+            options.extend(_options(prop.mapper.class_, child_definition, children, child_loader))
+
+    columns = [getattr(model, key) for key in sorted(keys)]
+    options.insert(0, loader.load_only(*columns) if loader is not None else load_only(*columns))
+    return options
+
+
+@lru_cache(maxsize=1024)
+def _load_options(
+    model: Type[Any], definition: StrawberryObjectDefinition, shape: Shape, required: Tuple[str, ...]
+) -> Tuple[ORMOption, ...]:
+    return tuple(_options(model, definition, shape, required=required))
+
+
+def load_options(
+    info: Info, model: Type[Any], type_: Type[Any], path: Tuple[str, ...] = (), required: Tuple[str, ...] = ()
+) -> Tuple[ORMOption, ...]:
+    """
+    Loader options loading only what the query selects from `model`: its selected columns,
+    and the selected relationships (with their own selected columns) through selectinload.
+    Relationships that are not selected are not loaded.
+    `type_` is the Strawberry type of the objects found at `path` below the resolver, and
+    `required` lists attributes loaded whatever the selection (e.g. the keys of a cursor).
+    The options are cached per selection.
+    """
+    return _load_options(model, type_.__strawberry_definition__, selection_shape(info, path), required)
+
+
+@lru_cache(maxsize=None)
+def column_fields(model: Type[Any], type_: Type[Any]) -> Dict[str, Tuple[str, ...]]:
+    """
+    The fields of `type_` read straight from the columns of `model`, with the attributes
+    each one is read from (several for the array properties, e.g. phoneNumbers).
+    Relationships and fields with a resolver of their own are left out.
+    """
+    mapper = inspect(model)
+    fields = {}
+    for name, field in _fields_by_name(type_.__strawberry_definition__).items():
+        if field.base_resolver is not None or isinstance(mapper.attrs.get(field.python_name), RelationshipProperty):
+            continue
+        attributes = _attributes(mapper, field)
+        if attributes:
+            fields[name] = attributes
+    return fields
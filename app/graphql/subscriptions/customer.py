@@ -0,0 +1,27 @@
+from typing import AsyncGenerator, List, Optional
+
+import strawberry
+from strawberry.types import Info
+
+from app.database.database import folder_of
+from app.graphql.pollers import changed_rows, table_poller
+from app.graphql.types.customer import Customer as CustomerType
+from app.middleware.auth.permissions import IsAuthenticated
+from app.models.customer import Customer as CustomerModel
+
+ContextType = dict
+
+
+@strawberry.type
+class CustomerSubscription:
+    @strawberry.subscription(permission_classes=[IsAuthenticated])
+    async def customer_changed(  # noqa: PLR6301
+        self, info: Info[ContextType, None], codes: Optional[List[str]] = None
+    ) -> AsyncGenerator[CustomerType, None]:
+        """Sends every customer changed from now on, or only those of `codes`."""
+        poller = table_poller(CustomerModel, folder_of(info.context['db']))
+        wanted = set(codes) if codes is not None else None
+
+        async for customer in changed_rows(info.context, poller):
+            if wanted is None or customer.customerCode in wanted:
+                yield customer
@@ -0,0 +1,32 @@
+from typing import AsyncGenerator, List, Optional
+
+import strawberry
+from strawberry.types import Info
+
+from app.database.database import folder_of
+from app.graphql.pollers import changed_rows, current_row, table_poller
+from app.graphql.selection import load_options
+from app.graphql.types.site import Site as SiteType
+from app.middleware.auth.permissions import IsAuthenticated
+from app.models.corporation import Sites as SitesModel
+
+ContextType = dict
+
+
+@strawberry.type
+class SiteSubscription:
+    @strawberry.subscription(permission_classes=[IsAuthenticated])
+    async def site_changed(  # noqa: PLR6301
+        self, info: Info[ContextType, None], codes: Optional[List[str]] = None
+    ) -> AsyncGenerator[SiteType, None]:
+        """Sends every site changed from now on, or only those of `codes`."""
+        poller = table_poller(SitesModel, folder_of(info.context['db']))
+        wanted = set(codes) if codes is not None else None
+
+        # the relationships are loaded for each change, as far as the subscription selects them
+        options = load_options(info, SitesModel, SiteType, required=('code',))
+        async for changed in changed_rows(info.context, poller):
+            if wanted is None or changed.code in wanted:
+                site = await current_row(info.context['db'], changed, options)
+                if site is not None:
+                    yield site
@@ -1,3 +1,5 @@
+import datetime
+from enum import Enum
 from typing import List, Optional
 
 import strawberry
@@ -20,3 +22,11 @@ class Address:
     phoneNumbers: List[Optional[str]]
     emails: List[Optional[str]]
     website: Optional[str]
+    updateDatetime: datetime.datetime
+    updateChanges: int
+
+
+@strawberry.enum
+class AddressGroupBy(Enum):
+    COUNTRY = 'country'
+    ENTITY_TYPE = 'entityType'
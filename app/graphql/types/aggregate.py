@@ -0,0 +1,9 @@
+from typing import Optional
+
+import strawberry
+
+
+@strawberry.type
+class GroupCount:
+    key: Optional[str] = strawberry.field(description='Value of the grouping column')
+    count: int
@@ -1,7 +1,10 @@
+from enum import Enum
 from typing import TYPE_CHECKING, Annotated, List, Optional
 
 import strawberry
+from strawberry.types import Info
 
+from app.core.local_menus import Chapter601
 from app.graphql.types.address import Address as AddressType
 
 if TYPE_CHECKING:
@@ -18,9 +21,12 @@ class Company:
     defaultAddress: Optional[str]
     vatNumber: Optional[str]
 
-    companyAddresses: List[AddressType] = strawberry.field(
-        description='List of addresses associated with this company (entityType=2)'
+    @strawberry.field(
+        description='List of addresses associated with this company (entityType=2)',
+        metadata={'columns': ('company',)},
     )
+    async def companyAddresses(self, info: Info) -> List[AddressType]:
+        return await info.context['address_loader'].load((Chapter601.COMPANY, self.company))
 
     companySites: List[Annotated['Site', strawberry.lazy('app.graphql.types.site')]] = strawberry.field(
         description='List of sites associated with this company',
@@ -30,3 +36,16 @@ class Company:
     #     resolver=lambda root, info: list_sites(root, info),  # noqa: PLW0108
     #     description='List of sites associated with this company',
     # )
+
+
+@strawberry.input
+class CompanyFilter:
+    codePrefix: Optional[str] = None
+    legislation: Optional[str] = None
+    country: Optional[str] = None
+
+
+@strawberry.enum
+class CompanyOrder(Enum):
+    CODE = 'code'
+    LEGISLATION = 'legislation'
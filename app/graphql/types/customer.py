@@ -1,7 +1,11 @@
+import datetime
+from enum import Enum
 from typing import List, Optional
 
 import strawberry
+from strawberry.types import Info
 
+from app.core.local_menus import Chapter601
 from app.graphql.types.address import Address as AddressType
 
 
@@ -12,7 +16,36 @@ class Customer:
     isActive: Optional[int]
     currency: Optional[str]
     paymentTerm: Optional[str]
+    updateDatetime: datetime.datetime
+    updateChanges: int
 
-    customerAddresses: List[AddressType] = strawberry.field(
-        description='List of addresses associated with this site (entityType=1)'
+    @strawberry.field(
+        description='List of addresses associated with this customer (entityType=1)',
+        metadata={'columns': ('customerCode',)},
     )
+    async def customerAddresses(self, info: Info) -> List[AddressType]:
+        return await info.context['address_loader'].load((Chapter601.BUSINESS_PARTNER, self.customerCode))
+
+
+@strawberry.input
+class CustomerFilter:
+    codePrefix: Optional[str] = None
+    namePrefix: Optional[str] = None
+    country: Optional[str] = strawberry.field(default=None, description='Country name (ZCRYNAM_0)')
+    isActive: Optional[int] = None
+    currency: Optional[str] = None
+    category: Optional[str] = None
+
+
+@strawberry.enum
+class CustomerOrder(Enum):
+    CODE = 'code'
+    NAME = 'name'
+    COUNTRY = 'country'
+
+
+@strawberry.enum
+class CustomerGroupBy(Enum):
+    CURRENCY = 'currency'
+    CATEGORY = 'category'
+    IS_ACTIVE = 'isActive'
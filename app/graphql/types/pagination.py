@@ -0,0 +1,50 @@
+from typing import Generic, List, Optional, TypeVar
+
+import strawberry
+from sqlalchemy import Select
+from strawberry.types import Info
+
+from app.database.database import execute
+
+NodeType = TypeVar('NodeType')
+
+
+@strawberry.type
+class PageInfo:
+    hasNextPage: bool
+    hasPreviousPage: bool
+    startCursor: Optional[str]
+    endCursor: Optional[str]
+
+
+@strawberry.type
+class Edge(Generic[NodeType]):
+    node: NodeType
+    cursor: str = strawberry.field(description='Opaque cursor of this node, for the after and before arguments')
+
+
+@strawberry.type
+class Connection(Generic[NodeType]):
+    edges: List[Edge[NodeType]]
+    pageInfo: PageInfo
+
+    # COUNT of the filtered rows, only run when totalCount is selected
+    countStatement: strawberry.Private[Optional[Select]] = None
+    # number of nodes, when they are counted in memory
+    count: strawberry.Private[Optional[int]] = None
+
+    @strawberry.field(description='Number of nodes matching the filter, across all the pages')
+    async def totalCount(self, info: Info) -> int:
+        if self.count is not None:
+            return self.count
+        result = await execute(info.context['db'], self.countStatement)
+        return result.scalar_one()
+
+
+@strawberry.type
+class ChangeFeed(Generic[NodeType]):
+    nodes: List[NodeType] = strawberry.field(description='Nodes changed after the watermark, oldest change first')
+    watermark: Optional[str] = strawberry.field(
+        description='Opaque watermark of the last change read, for the after argument of the next call'
+    )
+    hasMore: bool = strawberry.field(description='Whether more changes follow, to read right away with the watermark')
@@ -1,7 +1,10 @@
+from enum import Enum
 from typing import TYPE_CHECKING, Annotated, List, Optional
 
 import strawberry
+from strawberry.types import Info
 
+from app.core.local_menus import Chapter601
 from app.graphql.types.address import Address as AddressType
 
 if TYPE_CHECKING:
@@ -20,10 +23,27 @@ class Site:
     legislation: Optional[str]
     defaultAddress: Optional[str]
 
-    siteAddresses: List[AddressType] = strawberry.field(
-        description='List of addresses associated with this site (entityType=3)'
+    @strawberry.field(
+        description='List of addresses associated with this site (entityType=3)',
+        metadata={'columns': ('code',)},
     )
+    async def siteAddresses(self, info: Info) -> List[AddressType]:
+        return await info.context['address_loader'].load((Chapter601.SITE, self.code))
 
     company: Annotated['Company', strawberry.lazy('app.graphql.types.company')] = strawberry.field(
         description='Company associated with this site',
     )
+
+
+@strawberry.input
+class SiteFilter:
+    codePrefix: Optional[str] = None
+    legalCompany: Optional[str] = None
+    legislation: Optional[str] = None
+    country: Optional[str] = None
+
+
+@strawberry.enum
+class SiteOrder(Enum):
+    CODE = 'code'
+    LEGAL_COMPANY = 'legalCompany'
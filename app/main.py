@@ -1,8 +1,20 @@
 from fastapi import FastAPI
 
+from app.core.lifespan import lifespan
+from app.core.settings import COMPRESSION_ENABLED
+from app.middleware.compression import CompressionMiddleware
+from app.routers.export import export_router
+from app.routers.health import health_router
+from app.routers.metrics import metrics_router
 from app.routers.routers import graphql_app
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
+
+if COMPRESSION_ENABLED:
+    app.add_middleware(CompressionMiddleware)
 
 
 app.include_router(graphql_app, prefix='/graphql')
+app.include_router(export_router, prefix='/export')
+app.include_router(health_router, prefix='/health')
+app.include_router(metrics_router, prefix='/metrics')
@@ -19,6 +19,14 @@ class JWTManager:
         encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
         return encoded_jwt
 
+    @staticmethod
+    def get_claims(token: str) -> dict:
+        """Return the claims of a valid token, or an empty dict."""
+        try:
+            return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        except jwt.PyJWTError:
+            return {}
+
     @staticmethod
     def verify_token(token: str) -> bool:
         try:
@@ -1,22 +1,41 @@
-from typing import Any
+from typing import Any, Dict, Optional
 
+from fastapi import HTTPException, Request, status
+from fastapi.requests import HTTPConnection
 from strawberry.permission import BasePermission
 from strawberry.types import Info
 
 from app.middleware.auth.manager import JWTManager
 
 
+def is_authenticated(request: Optional[HTTPConnection], authentication: Optional[str] = None) -> bool:
+    """
+    Whether the request (or WebSocket handshake) carries a valid token in its authentication header,
+    or else in `authentication` (e.g. the connection_init payload of a WebSocket).
+    """
+    # Access headers authentication
+    authentication = (request.headers.get('authentication') if request is not None else None) or authentication
+
+    if authentication:
+        token = authentication.split('Bearer ')[-1]
+        return JWTManager.verify_token(token)
+
+    return False
+
+
+def context_authenticated(context: Dict[str, Any]) -> bool:
+    """Whether a GraphQL context is authenticated, by its request or by the connection_init of its WebSocket."""
+    return is_authenticated(context.get('request'), context.get('authentication'))
+
+
 class IsAuthenticated(BasePermission):
     message = 'User is not authenticated'
 
     def has_permission(self, source: Any, info: Info, **kwargs) -> bool:  # noqa: PLR6301
-        request = info.context.get('request')
-
-        # Access headers authentication
-        authentication = request.headers.get('authentication')
+        return context_authenticated(info.context)
 
-        if authentication:
-            token = authentication.split('Bearer ')[-1]
-            return JWTManager.verify_token(token)
 
-        return False
+def require_authentication(request: Request) -> None:
+    """FastAPI dependency: the REST routes accept the same tokens as IsAuthenticated."""
+    if not is_authenticated(request):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=IsAuthenticated.message)
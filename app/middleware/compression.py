@@ -0,0 +1,110 @@
+from typing import Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.middleware.gzip import GZipResponder, IdentityResponder
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.settings import COMPRESSION_MIN_SIZE
+from app.middleware.etag import encoded_etag
+
+try:
+    import brotli
+except ImportError:  # optional: responses are only gzipped without it
+    brotli = None
+
+# Levels suited to responses compressed on the fly: most of the gain for a fraction of the CPU
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+# Streams sent as they come, and formats compressed already
+EXCLUDED_CONTENT_TYPES = ('text/event-stream', 'application/vnd.apache.parquet')
+
+
+def negotiate(accept_encoding: str) -> Optional[str]:
+    """The encoding of the response: br (when brotli is installed) or gzip, as weighted by Accept-Encoding."""
+    weights = {}
+    for part in accept_encoding.split(','):
+        coding, _, parameters = part.partition(';')
+        weight = 1.0
+        parameters = parameters.strip()
+        if parameters.startswith('q='):
+            try:
+                weight = float(parameters[2:])
+            except ValueError:
+                weight = 0.0
+        weights[coding.strip().lower()] = weight
+
+    def weight(coding: str) -> float:
+        return weights.get(coding, weights.get('*', 0.0))
+
+    # max keeps the first of the codings weighted the same
+    preferred = max(('br', 'gzip') if brotli is not None else ('gzip',), key=weight)
+    return preferred if weight(preferred) > 0 else None
+
+
+class _Representation:
+    """
+    Leaves the excluded content types alone, and tags the ETag of a response with the encoding
+    applied to it: the compressed body is another representation, with its own strong ETag.
+    """
+
+    content_encoding: str
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        async def send_tagged(message: Message) -> None:
+            if message['type'] == 'http.response.start':
+                headers = MutableHeaders(raw=message['headers'])
+                if 'etag' in headers and headers.get('content-encoding') == self.content_encoding:
+                    headers['etag'] = encoded_etag(headers['etag'], self.content_encoding)
+            await send(message)
+
+        await super().__call__(scope, receive, send_tagged)
+
+    async def send_with_compression(self, message: Message) -> None:
+        await super().send_with_compression(message)
+        if message['type'] == 'http.response.start':
+            content_type = Headers(raw=message['headers']).get('content-type', '')
+            self.content_type_is_excluded |= content_type.startswith(EXCLUDED_CONTENT_TYPES)
+
+
+class _GzipResponder(_Representation, GZipResponder):
+    pass
+
+
+class _BrotliResponder(_Representation, IdentityResponder):
+    content_encoding = 'br'
+
+    def __init__(self, app: ASGIApp, minimum_size: int, quality: int = BROTLI_QUALITY):
+        super().__init__(app, minimum_size)
+        self.compressor = brotli.Compressor(quality=quality)
+
+    def apply_compression(self, body: bytes, *, more_body: bool) -> bytes:
+        # every chunk of a stream is flushed, so the client reads it as it comes
+        compressed = self.compressor.process(body)
+        return compressed + (self.compressor.flush() if more_body else self.compressor.finish())
+
+
+class CompressionMiddleware:
+    """
+    Compresses the HTTP responses of COMPRESSION_MIN_SIZE bytes or more with the encoding
+    the client prefers, brotli or gzip; streamed responses (exports) are compressed chunk by chunk.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = COMPRESSION_MIN_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate(Headers(scope=scope).get('accept-encoding', ''))
+        if encoding == 'br':
+            responder = _BrotliResponder(self.app, self.minimum_size)
+        elif encoding == 'gzip':
+            responder = _GzipResponder(self.app, self.minimum_size, compresslevel=GZIP_LEVEL)
+        else:
+            responder = IdentityResponder(self.app, self.minimum_size)
+
+        await responder(scope, receive, send)
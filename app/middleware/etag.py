@@ -0,0 +1,48 @@
+import hashlib
+from typing import Optional
+
+from fastapi import Response, status
+from fastapi.requests import HTTPConnection
+
+# Suffix of the ETag of a compressed representation, e.g. "abc-gzip" for the gzip of "abc"
+ENCODING_SEPARATOR = '-'
+
+# The body of a GraphQL GET depends on the token and on the folder it selects
+VARY = 'authentication, x-folder, x-read-your-writes'
+
+
+def strong_etag(body: bytes) -> str:
+    return f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+
+def encoded_etag(etag: str, encoding: str) -> str:
+    """The strong ETag of the `encoding` (gzip, br) representation of a response."""
+    return f'{etag[:-1]}{ENCODING_SEPARATOR}{encoding}"' if etag.endswith('"') else etag
+
+
+def matching_etag(if_none_match: str, etag: str) -> Optional[str]:
+    """The tag of If-None-Match naming `etag` in any of its representations (weak comparison, RFC 9110)."""
+    for candidate in if_none_match.split(','):
+        tag = candidate.strip()
+        if tag == '*':
+            return etag
+        if tag.removeprefix('W/').split(ENCODING_SEPARATOR)[0].rstrip('"') == etag.rstrip('"'):
+            return tag
+    return None
+
+
+def revalidate(request: HTTPConnection, response: Response) -> Response:
+    """
+    Tag `response` with a strong ETag of its body, and answer 304 Not Modified, without
+    the body, when the request already holds it. Clients must revalidate before reusing it.
+    """
+    etag = strong_etag(response.body)
+    headers = {'ETag': etag, 'Cache-Control': 'private, no-cache', 'Vary': VARY}
+
+    matched = matching_etag(request.headers.get('if-none-match', ''), etag)
+    if matched is not None:
+        # the validator of the representation the client holds, e.g. its gzip
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={**headers, 'ETag': matched})
+
+    response.headers.update(headers)
+    return response
@@ -23,6 +23,7 @@ class Address(Base, AuditMixin, PrimaryKeyMixin, ArrayColumnMixin):
         PrimaryKeyConstraint('ROWID', name='BPADDRESS_ROWID'),
         Index('BPADDRESS_BPA0', 'BPATYP_0', 'BPANUM_0', 'BPAADD_0', unique=True),
         Index('BPADDRESS_SPE_BPA0', 'BPANUM_0', 'BPAADD_0'),
+        Index('BPADDRESS_ZUPD0', 'UPDDATTIM_0', 'ROWID', unique=True),
     )
 
     entityType: Mapped[int] = mapped_column('BPATYP_0', TINYINT, server_default=text('((1))'))
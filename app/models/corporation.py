@@ -170,7 +170,7 @@ class Sites(Base, AuditMixin, PrimaryKeyMixin, CreateUpdateDateMixin, ArrayColum
         primaryjoin='and_(Address.entityNumber == Sites.code, Address.entityType == 3)',
         foreign_keys='Address.entityNumber',
         overlaps='customerAddresses, companyAddresses',
-        lazy='selectin',
+        lazy='raise_on_sql',
         cascade='save-update, merge, refresh-expire, expunge',
     )
 
@@ -178,7 +178,7 @@ class Sites(Base, AuditMixin, PrimaryKeyMixin, CreateUpdateDateMixin, ArrayColum
         'Company',
         primaryjoin='and_(Company.company == Sites.legalCompany)',
         foreign_keys='Company.company',
-        lazy='selectin',
+        lazy='raise_on_sql',
         cascade='save-update, merge, refresh-expire, expunge',
     )
 
@@ -456,7 +456,7 @@ class Company(Base, AuditMixin, PrimaryKeyMixin, CreateUpdateDateMixin, ArrayCol
         primaryjoin='and_(Address.entityNumber == Company.company, Address.entityType == 2)',
         foreign_keys='Address.entityNumber',
         overlaps='customerAddresses, siteAddresses',
-        lazy='selectin',
+        lazy='raise_on_sql',
         cascade='save-update, merge, refresh-expire, expunge',
     )
 
@@ -464,6 +464,6 @@ class Company(Base, AuditMixin, PrimaryKeyMixin, CreateUpdateDateMixin, ArrayCol
         'Sites',
         primaryjoin='and_(Company.company == Sites.legalCompany)',
         foreign_keys='Sites.legalCompany',
-        lazy='selectin',
+        lazy='raise_on_sql',
         cascade='save-update, merge, refresh-expire, expunge',
     )
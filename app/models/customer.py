@@ -31,6 +31,7 @@ class Customer(Base, AuditMixin, PrimaryKeyMixin, CreateUpdateDateMixin, ArrayCo
         Index('BPCUSTOMER_BPC0', 'BPCNUM_0', unique=True),
         Index('BPCUSTOMER_BPC1', 'BPCNAM_0'),
         Index('BPCUSTOMER_ZBPC0', 'ZCRYNAM_0', 'BPCNAM_0', 'BPCNUM_0', unique=True),
+        Index('BPCUSTOMER_ZUPD0', 'UPDDATTIM_0', 'ROWID', unique=True),
     )
 
     customerCode: Mapped[str] = mapped_column('BPCNUM_0', Unicode(15, 'Latin1_General_BIN2'), server_default=text("''"))
@@ -330,6 +331,6 @@ class Customer(Base, AuditMixin, PrimaryKeyMixin, CreateUpdateDateMixin, ArrayCo
         primaryjoin='and_(Address.entityNumber == Customer.customerCode, Address.entityType == 1)',
         foreign_keys='Address.entityNumber',
         overlaps='siteAddresses',
-        lazy='selectin',
+        lazy='raise_on_sql',
         cascade='save-update, merge, refresh-expire, expunge',
     )
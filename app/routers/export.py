@@ -0,0 +1,245 @@
+import csv
+import io
+import json
+from enum import Enum
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Sequence, Tuple, Type, Union
+
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import ColumnElement, Row, select
+
+from app.core.settings import EXPORT_BATCH_SIZE
+from app.database.database import REPLICA, LazySession, UnknownFolderError, db, route_session, select_folder, stream
+from app.graphql.queries.company import COMPANY_ORDERS, company_predicates
+from app.graphql.queries.customer import CUSTOMER_ORDERS, customer_predicates
+from app.graphql.queries.site import SITE_ORDERS, site_predicates
+from app.graphql.selection import column_fields
+from app.graphql.types.address import Address as AddressType
+from app.graphql.types.company import Company as CompanyType
+from app.graphql.types.company import CompanyFilter, CompanyOrder
+from app.graphql.types.customer import Customer as CustomerType
+from app.graphql.types.customer import CustomerFilter, CustomerOrder
+from app.graphql.types.site import Site as SiteType
+from app.graphql.types.site import SiteFilter, SiteOrder
+from app.middleware.auth.permissions import require_authentication
+from app.models.address import Address as AddressModel
+from app.models.corporation import Company as CompanyModel
+from app.models.corporation import Sites as SitesModel
+from app.models.customer import Customer as CustomerModel
+from app.routers.routers import request_folder
+from app.services.columnar import COLUMNAR_AVAILABLE, ColumnarWriter, arrow_schema
+
+export_router = APIRouter(dependencies=[Depends(require_authentication)])
+
+
+class ExportFormat(str, Enum):
+    NDJSON = 'ndjson'
+    CSV = 'csv'
+    ARROW = 'arrow'
+    PARQUET = 'parquet'
+
+
+MEDIA_TYPES = {
+    ExportFormat.NDJSON: 'application/x-ndjson',
+    ExportFormat.CSV: 'text/csv',
+    ExportFormat.ARROW: 'application/vnd.apache.arrow.stream',
+    ExportFormat.PARQUET: 'application/vnd.apache.parquet',
+}
+
+
+def _projection(model: Type[Any], type_: Type[Any], fields: Optional[str]) -> Dict[str, Tuple[str, ...]]:
+    """The requested fields (comma separated, all of them by default) and their attributes."""
+    available = column_fields(model, type_)
+    if not fields:
+        return available
+
+    names = [name.strip() for name in fields.split(',') if name.strip()]
+    unknown = [name for name in names if name not in available]
+    if unknown:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f'Unknown fields: {", ".join(unknown)}.')
+    return {name: available[name] for name in names}
+
+
+def _records(projection: Dict[str, Tuple[str, ...]], rows: Sequence[Row]) -> Iterable[Dict[str, Any]]:
+    for row in rows:
+        mapping = row._mapping
+        yield {
+            # array properties are exported as a list, like the GraphQL field
+            name: mapping[attributes[0]] if attributes == (name,) else [mapping[key] for key in attributes]
+            for name, attributes in projection.items()
+        }
+
+
+class _NdjsonWriter:
+    """One JSON object per row and line."""
+
+    def __init__(self, projection: Dict[str, Tuple[str, ...]]):
+        self.projection = projection
+
+    def header(self) -> str:  # noqa: PLR6301
+        return ''
+
+    def write(self, rows: Sequence[Row]) -> str:
+        return ''.join(json.dumps(record, default=str) + '\n' for record in _records(self.projection, rows))
+
+    def close(self) -> str:  # noqa: PLR6301
+        return ''
+
+
+class _CsvWriter(_NdjsonWriter):
+    """A header line with the field names, then one line per row."""
+
+    def header(self) -> str:
+        buffer = io.StringIO()
+        csv.writer(buffer).writerow(self.projection)
+        return buffer.getvalue()
+
+    def write(self, rows: Sequence[Row]) -> str:
+        buffer = io.StringIO()
+        # a list takes one cell, as a JSON array
+        csv.writer(buffer).writerows(
+            [json.dumps(value) if isinstance(value, list) else value for value in record.values()]
+            for record in _records(self.projection, rows)
+        )
+        return buffer.getvalue()
+
+
+def _writer(
+    export_format: ExportFormat, model: Type[Any], projection: Dict[str, Tuple[str, ...]]
+) -> Union[_NdjsonWriter, ColumnarWriter]:
+    if export_format == ExportFormat.NDJSON:
+        return _NdjsonWriter(projection)
+    if export_format == ExportFormat.CSV:
+        return _CsvWriter(projection)
+
+    if not COLUMNAR_AVAILABLE:
+        raise HTTPException(
+            status_code=status.HTTP_501_NOT_IMPLEMENTED, detail=f'The {export_format.value} format needs pyarrow.'
+        )
+    widths = [len(attributes) for attributes in projection.values()]
+    return ColumnarWriter(arrow_schema(model, projection), widths, parquet=export_format == ExportFormat.PARQUET)
+
+
+def _export(  # noqa: PLR0913, PLR0917
+    request: Request,
+    model: Type[Any],
+    projection: Dict[str, Tuple[str, ...]],
+    predicates: List[ColumnElement[bool]],
+    order: Sequence[Any],
+    export_format: ExportFormat,
+    filename: str,
+) -> StreamingResponse:
+    """
+    Stream the rows of `model` matching `predicates`, in `order`, as NDJSON, CSV, Arrow or Parquet.
+    The rows are read through a server-side cursor one batch at a time and written out
+    as they come, so memory stays flat whatever the size of the export.
+    """
+    writer = _writer(export_format, model, projection)
+
+    # the session outlives the route (it is used while the body is sent), so it is not a dependency
+    session = LazySession(db.SessionLocal)
+    route_session(session, REPLICA)
+    folder = request_folder(request)
+    if folder:
+        try:
+            select_folder(session, folder)
+        except UnknownFolderError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e)) from e
+
+    # plain rows: no ORM entities, no identity map
+    columns = [getattr(model, key) for attributes in projection.values() for key in attributes]
+    stmt = select(*columns).where(*predicates).order_by(*order)
+
+    async def body() -> AsyncIterator[Union[str, bytes]]:
+        try:
+            yield writer.header()
+            async for rows in stream(session, stmt, EXPORT_BATCH_SIZE):
+                yield writer.write(rows)
+            yield writer.close()
+        finally:
+            await session.close()
+
+    return StreamingResponse(
+        body(),
+        media_type=MEDIA_TYPES[export_format],
+        headers={'Content-Disposition': f'attachment; filename="{filename}.{export_format.value}"'},
+    )
+
+
+@export_router.get('/customers')
+def export_customers(  # noqa: PLR0913, PLR0917
+    request: Request,
+    format: ExportFormat = ExportFormat.NDJSON,
+    fields: Optional[str] = None,
+    order_by: CustomerOrder = CustomerOrder.CODE,
+    code_prefix: Optional[str] = None,
+    name_prefix: Optional[str] = None,
+    country: Optional[str] = None,
+    is_active: Optional[int] = None,
+    currency: Optional[str] = None,
+    category: Optional[str] = None,
+) -> StreamingResponse:
+    """Exports the customers (BPCUSTOMER), with the filters and fields of the customers query."""
+    where = CustomerFilter(
+        codePrefix=code_prefix,
+        namePrefix=name_prefix,
+        country=country,
+        isActive=is_active,
+        currency=currency,
+        category=category,
+    )
+    # an export reads the whole table anyway, the residual filters need no index
+    indexed, residual = customer_predicates(where)
+    projection = _projection(CustomerModel, CustomerType, fields)
+    return _export(
+        request, CustomerModel, projection, indexed + residual, CUSTOMER_ORDERS[order_by], format, 'customers'
+    )
+
+
+@export_router.get('/companies')
+def export_companies(  # noqa: PLR0913, PLR0917
+    request: Request,
+    format: ExportFormat = ExportFormat.NDJSON,
+    fields: Optional[str] = None,
+    order_by: CompanyOrder = CompanyOrder.CODE,
+    code_prefix: Optional[str] = None,
+    legislation: Optional[str] = None,
+    country: Optional[str] = None,
+) -> StreamingResponse:
+    """Exports the companies (COMPANY), with the filters and fields of the companies query."""
+    where = CompanyFilter(codePrefix=code_prefix, legislation=legislation, country=country)
+    indexed, residual = company_predicates(where)
+    projection = _projection(CompanyModel, CompanyType, fields)
+    return _export(request, CompanyModel, projection, indexed + residual, COMPANY_ORDERS[order_by], format, 'companies')
+
+
+@export_router.get('/sites')
+def export_sites(  # noqa: PLR0913, PLR0917
+    request: Request,
+    format: ExportFormat = ExportFormat.NDJSON,
+    fields: Optional[str] = None,
+    order_by: SiteOrder = SiteOrder.CODE,
+    code_prefix: Optional[str] = None,
+    legal_company: Optional[str] = None,
+    legislation: Optional[str] = None,
+    country: Optional[str] = None,
+) -> StreamingResponse:
+    """Exports the sites (FACILITY), with the filters and fields of the sites query."""
+    where = SiteFilter(codePrefix=code_prefix, legalCompany=legal_company, legislation=legislation, country=country)
+    indexed, residual = site_predicates(where)
+    projection = _projection(SitesModel, SiteType, fields)
+    return _export(request, SitesModel, projection, indexed + residual, SITE_ORDERS[order_by], format, 'sites')
+
+
+@export_router.get('/addresses')
+def export_addresses(
+    request: Request,
+    format: ExportFormat = ExportFormat.NDJSON,
+    fields: Optional[str] = None,
+    entity_type: Optional[int] = None,
+) -> StreamingResponse:
+    """Exports the addresses (BPADDRESS), in entity type, entity number and code order (BPADDRESS_BPA0)."""
+    predicates = [AddressModel.entityType == entity_type] if entity_type is not None else []
+    projection = _projection(AddressModel, AddressType, fields)
+    order = (AddressModel.entityType, AddressModel.entityNumber, AddressModel.code)
+    return _export(request, AddressModel, projection, predicates, order, format, 'addresses')
@@ -0,0 +1,20 @@
+from typing import Any, Dict
+
+from fastapi import APIRouter, Request, Response, status
+
+health_router = APIRouter()
+
+
+@health_router.get('/live')
+def live() -> Dict[str, Any]:
+    """Liveness probe: the process is up and serving requests."""
+    return {'status': 'ok'}
+
+
+@health_router.get('/ready')
+def ready(request: Request, response: Response) -> Dict[str, Any]:
+    """Readiness probe: stays at 503 until the startup warm-up has finished."""
+    report = request.app.state.warmup.report()
+    if not report['ready']:
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    return report
@@ -0,0 +1,39 @@
+from typing import Any, Dict
+
+from fastapi import APIRouter
+
+from app.database.database import db
+from app.database.executor import db_executor
+from app.graphql import pollers
+from app.graphql.documents import documents, introspection
+from app.graphql.response_cache import response_cache
+
+metrics_router = APIRouter()
+
+
+@metrics_router.get('/pool')
+def pool_statistics() -> Dict[str, Any]:
+    """Live statistics of the database connection pool, used to size the workers."""
+    return db.pool_statistics()
+
+
+@metrics_router.get('/executor')
+def executor_statistics() -> Dict[str, Any]:
+    """Queue depth and wait times of the executor running the synchronous database calls."""
+    return db_executor.statistics()
+
+
+@metrics_router.get('/graphql')
+def graphql_statistics() -> Dict[str, Any]:
+    """Size and hit/miss counters of the parsed document, introspection and response caches."""
+    return {
+        'documents': documents.statistics(),
+        'introspection': introspection.statistics(),
+        'responses': response_cache.statistics(),
+    }
+
+
+@metrics_router.get('/subscriptions')
+def subscription_statistics() -> Dict[str, Any]:
+    """Subscribers and polls of the shared table pollers behind the subscriptions."""
+    return pollers.statistics()
@@ -1,18 +1,158 @@
-from typing import Any, Dict
+import json
+from typing import Any, Dict, Optional, Union
 
-from fastapi import Depends
-from sqlalchemy.orm import Session
+from fastapi import Depends, HTTPException, Request, Response, status
+from fastapi.requests import HTTPConnection
+from graphql import GraphQLError
+from strawberry.exceptions import ConnectionRejectionError
 from strawberry.fastapi import GraphQLRouter
+from strawberry.http import GraphQLRequestData
+from strawberry.http.async_base_view import AsyncHTTPRequestAdapter
+from strawberry.types import ExecutionResult
+from strawberry.types.unset import UNSET, UnsetType
 
-from app.database.database import db
+from app.database.database import LazySession, UnknownFolderError, db, select_folder
+from app.graphql.documents import PersistedQueryNotFound, documents, persisted_query, query_hash
+from app.graphql.loaders.address import address_loader
 from app.graphql.schema import schema
+from app.middleware.auth.manager import JWTManager
+from app.middleware.auth.permissions import IsAuthenticated
+from app.middleware.etag import revalidate
 
+# Header a client sends to read its own writes: the query is then served by the primary
+READ_YOUR_WRITES_HEADER = 'x-read-your-writes'
+
+# Header and token claim selecting the X3 folder of a request
+FOLDER_HEADER = 'x-folder'
+FOLDER_CLAIM = 'folder'
+
+
+def request_folder(request: HTTPConnection) -> str:
+    """The folder asked by the request; a token bound to a folder cannot select another one."""
+    folder = request.headers.get(FOLDER_HEADER, '')
+
+    authentication = request.headers.get('authentication')
+    claim = JWTManager.get_claims(authentication.split('Bearer ')[-1]).get(FOLDER_CLAIM) if authentication else None
+
+    if claim and folder and folder.upper() != claim.upper():
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=f'Token is not valid for folder {folder}.')
+
+    return folder or claim or ''
+
+
+async def get_context(request: HTTPConnection, session: LazySession = Depends(db.get_lazy_db)) -> Dict[str, Any]:
+    folder = request_folder(request)
+    if folder:
+        try:
+            select_folder(session, folder)
+        except UnknownFolderError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e)) from e
 
-async def get_context(session: Session = Depends(db.get_db)) -> Dict[str, Any]:
     return {
         'db': session,
+        'address_loader': address_loader(session),
+        'read_your_writes': request.headers.get(READ_YOUR_WRITES_HEADER, '').lower() in {'1', 'true', 'yes'},
         # Você pode adicionar outras coisas ao contexto aqui, como usuário logado
     }
 
 
-graphql_app = GraphQLRouter(schema, context_getter=get_context)
+async def _request_extensions(request: AsyncHTTPRequestAdapter) -> Dict[str, Any]:
+    if request.method == 'GET':
+        try:
+            extensions = json.loads(request.query_params.get('extensions') or '{}')
+        except ValueError:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail='Unable to parse extensions.')
+    else:
+        try:
+            body = json.loads(await request.get_body())
+        except ValueError:
+            # strawberry answers the malformed body itself
+            return {}
+        extensions = body.get('extensions') if isinstance(body, dict) else None
+
+    if extensions is not None and not isinstance(extensions, dict):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail='Extensions must be an object.')
+    return extensions or {}
+
+
+class PersistedQueryRouter(GraphQLRouter):
+    """
+    GraphQL router with automatic persisted queries: the client sends the SHA-256 of its query
+    in extensions.persistedQuery, and sends the query text itself only when the server
+    answers PersistedQueryNotFound. The query is then parsed and validated once (CachedDocuments).
+    The results of GET requests carry a strong ETag, and come back as 304 Not Modified while unchanged.
+    """
+
+    def should_render_graphql_ide(self, request: AsyncHTTPRequestAdapter) -> bool:
+        # a GET sending only the hash of a persisted query is not a browser asking for the IDE
+        return super().should_render_graphql_ide(request) and 'extensions' not in request.query_params
+
+    async def parse_http_body(self, request: AsyncHTTPRequestAdapter) -> GraphQLRequestData:
+        request_data = await super().parse_http_body(request)
+
+        persisted: Optional[Dict[str, Any]] = (await _request_extensions(request)).get('persistedQuery')
+        key = persisted.get('sha256Hash') if isinstance(persisted, dict) else None
+        persisted_query.set(key)
+        if key is None:
+            return request_data
+
+        if request_data.query is None:
+            cached = documents.get(key, count=False)
+            if cached is None:
+                raise PersistedQueryNotFound(key)
+            request_data.query = cached.query
+        elif query_hash(request_data.query) != key:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail='Provided sha does not match query.')
+
+        return request_data
+
+    async def run(self, request: Any, context: Any = UNSET, root_value: Any = UNSET) -> Any:
+        response = await super().run(request, context=context, root_value=root_value)
+
+        # the result of a GET (persisted queries) is revalidated with its ETag instead of sent again
+        if (
+            request.scope['type'] == 'http'
+            and request.method == 'GET'
+            and isinstance(response, Response)
+            and response.status_code == status.HTTP_200_OK
+            and response.media_type == 'application/json'
+        ):
+            return revalidate(request, response)
+        return response
+
+    async def on_ws_connect(self, context: Dict[str, Any]) -> Union[UnsetType, None, Dict[str, object]]:  # noqa: PLR6301
+        # browsers cannot set the headers of a WebSocket: their token comes in the connection_init payload
+        params = context.get('connection_params')
+        authentication = params.get('authentication') if isinstance(params, dict) else None
+        if not isinstance(authentication, str) or not authentication:
+            return UNSET
+
+        claims = JWTManager.get_claims(authentication.split('Bearer ')[-1])
+        if not claims:
+            raise ConnectionRejectionError({'message': IsAuthenticated.message})
+
+        # as for the headers (request_folder), a token bound to a folder cannot select another one
+        claim = claims.get(FOLDER_CLAIM)
+        if claim:
+            folder = context['db'].info.get('folder')
+            if folder and folder.upper() != claim.upper():
+                raise ConnectionRejectionError({'message': f'Token is not valid for folder {folder}.'})
+            try:
+                select_folder(context['db'], claim)
+            except UnknownFolderError as e:
+                raise ConnectionRejectionError({'message': str(e)}) from e
+
+        # checked again by IsAuthenticated, and before each change a subscription sends
+        context['authentication'] = authentication
+        return UNSET
+
+    async def execute_operation(self, request: Request, context: Dict[str, Any], root_value: Any) -> Any:
+        try:
+            return await super().execute_operation(request, context, root_value)
+        except PersistedQueryNotFound:
+            # the client sends the query again, with its hash, to register it
+            error = GraphQLError('PersistedQueryNotFound', extensions={'code': 'PERSISTED_QUERY_NOT_FOUND'})
+            return ExecutionResult(data=None, errors=[error])
+
+
+graphql_app = PersistedQueryRouter(schema, context_getter=get_context)
@@ -0,0 +1,135 @@
+import io
+from typing import Any, Callable, Dict, List, Sequence, Tuple, Type
+
+from sqlalchemy import (
+    BINARY,
+    VARBINARY,
+    BigInteger,
+    Boolean,
+    Date,
+    DateTime,
+    Float,
+    Integer,
+    LargeBinary,
+    Numeric,
+    Row,
+    SmallInteger,
+)
+from sqlalchemy.dialects.mssql import TINYINT
+from sqlalchemy.sql.type_api import TypeEngine
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # optional: only the columnar exports need it
+    pa = pq = None
+
+COLUMNAR_AVAILABLE = pa is not None
+
+# SQL Server decimals go up to 38 digits, like the Arrow decimal128
+MAX_DECIMAL_PRECISION = 38
+
+
+def _decimal(column_type: Numeric) -> 'pa.DataType':
+    precision = min(column_type.precision or MAX_DECIMAL_PRECISION, MAX_DECIMAL_PRECISION)
+    return pa.decimal128(precision, column_type.scale or 0)
+
+
+# most specific first: TINYINT, SmallInteger and BigInteger are Integers, Float is a Numeric
+ARROW_TYPES: Tuple[Tuple[Type[TypeEngine], Callable[[Any], 'pa.DataType']], ...] = (
+    (TINYINT, lambda _: pa.uint8()),
+    (SmallInteger, lambda _: pa.int16()),
+    (BigInteger, lambda _: pa.int64()),
+    (Integer, lambda _: pa.int32()),
+    (Boolean, lambda _: pa.bool_()),
+    (Float, lambda _: pa.float64()),
+    (Numeric, _decimal),
+    (DateTime, lambda _: pa.timestamp('us')),
+    (Date, lambda _: pa.date32()),
+    (BINARY, lambda _: pa.binary()),
+    (VARBINARY, lambda _: pa.binary()),
+    (LargeBinary, lambda _: pa.binary()),
+)
+
+
+def arrow_type(column_type: TypeEngine) -> 'pa.DataType':
+    """The Arrow type of a column type, e.g. Numeric(28, 8) -> decimal128(28, 8), TINYINT -> uint8."""
+    for sql_type, factory in ARROW_TYPES:
+        if isinstance(column_type, sql_type):
+            return factory(column_type)
+    return pa.string()
+
+
+def arrow_schema(model: Type[Any], projection: Dict[str, Tuple[str, ...]]) -> 'pa.Schema':
+    """
+    The Arrow schema of the fields of `projection` (name -> model attributes).
+    Array properties become list columns, typed from their first column.
+    """
+    fields = []
+    for name, attributes in projection.items():
+        type_ = arrow_type(getattr(model, attributes[0]).expression.type)
+        fields.append(pa.field(name, type_ if attributes == (name,) else pa.list_(type_)))
+    return pa.schema(fields)
+
+
+class _Sink(io.RawIOBase):
+    """Write-only file keeping what was written until it is drained; tell() counts every byte written."""
+
+    def __init__(self):
+        super().__init__()
+        self.chunks: List[bytes] = []
+        self.position = 0
+
+    def writable(self) -> bool:  # noqa: PLR6301
+        return True
+
+    def write(self, data: Any) -> int:
+        chunk = bytes(data)
+        self.chunks.append(chunk)
+        self.position += len(chunk)
+        return len(chunk)
+
+    def tell(self) -> int:
+        return self.position
+
+    def drain(self) -> bytes:
+        data = b''.join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+class ColumnarWriter:
+    """
+    Encodes batches of rows as an Arrow IPC stream or a Parquet file.
+    Every batch is turned into one record batch (one row group for Parquet), built column
+    by column from the transposed rows, and its bytes are returned as soon as it is written.
+    """
+
+    def __init__(self, schema: 'pa.Schema', widths: Sequence[int], parquet: bool = False):
+        # `widths` is the number of selected columns behind each field of the schema
+        self.schema = schema
+        self.widths = widths
+        self.sink = _Sink()
+        file = pa.PythonFile(self.sink, mode='w')
+        self.writer = pq.ParquetWriter(file, schema) if parquet else pa.ipc.new_stream(file, schema)
+
+    def header(self) -> bytes:
+        return self.sink.drain()
+
+    def write(self, rows: Sequence[Row]) -> bytes:
+        columns = list(zip(*rows))
+        arrays, start = [], 0
+        for field, width in zip(self.schema, self.widths):
+            if pa.types.is_list(field.type):
+                values = [list(values) for values in zip(*columns[start : start + width])]
+            else:
+                values = columns[start]
+            arrays.append(pa.array(values, type=field.type))
+            start += width
+
+        self.writer.write_batch(pa.RecordBatch.from_arrays(arrays, schema=self.schema))
+        return self.sink.drain()
+
+    def close(self) -> bytes:
+        self.writer.close()
+        return self.sink.drain()
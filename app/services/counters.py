@@ -7,6 +7,7 @@ from sqlalchemy.engine.row import Row
 from sqlalchemy.orm import Session
 
 from app.core import local_menus, settings
+from app.database.database import folder_of
 
 
 def get_next_counter(
@@ -25,7 +26,7 @@ def get_next_counter(
     """
     try:
         # Attempts to get the counter definition
-        stmt_select = text(f'SELECT * FROM {settings.DB_SCHEMA}.ACODNUM WHERE CODNUM_0 = :code')
+        stmt_select = text(f'SELECT * FROM {folder_of(db)}.ACODNUM WHERE CODNUM_0 = :code')
 
         result = db.execute(stmt_select, {'code': counter_code})
         counter_data = result.mappings().one_or_none()
@@ -246,8 +247,11 @@ def _create_next_counter(db: Session, counter_code: str, **kwargs) -> str:
     if not length:
         length = 1
 
+    # schema_translate_map does not apply to text(), the folder of the session is written in the statements
+    folder = folder_of(db)
+
     stmt_select = text(
-        f'SELECT VALEUR_0 FROM {settings.DB_SCHEMA}.AVALNUM '
+        f'SELECT VALEUR_0 FROM {folder}.AVALNUM '
         f'WHERE CODNUM_0 = :code AND SITE_0 = :site '
         f'AND PERIODE_0 = :period AND COMP_0 = :comp'
     )
@@ -264,7 +268,7 @@ def _create_next_counter(db: Session, counter_code: str, **kwargs) -> str:
 
     if current_value > 1:
         stmt_update = text(
-            f'UPDATE {settings.DB_SCHEMA}.AVALNUM SET VALEUR_0 = :next_val '
+            f'UPDATE {folder}.AVALNUM SET VALEUR_0 = :next_val '
             f'WHERE CODNUM_0 = :code AND SITE_0 = :site '
             f'AND PERIODE_0 = :period AND COMP_0 = :comp'
         )
@@ -288,7 +292,7 @@ def _create_next_counter(db: Session, counter_code: str, **kwargs) -> str:
             raise ValueError(f'Erro ao atualizar o contador {counter_code}: {e}')
     else:
         stmt_insert = text(
-            f'INSERT INTO {settings.DB_SCHEMA}.AVALNUM ('
+            f'INSERT INTO {folder}.AVALNUM ('
             f'CODNUM_0, SITE_0, PERIODE_0, COMP_0, VALEUR_0, '
             f'CREUSR_0, UPDUSR_0, CREDATTIM_0, UPDDATTIM_0, AUUID_0) '
             f'VALUES (:code, :site, :period, :comp, :next_val, '
@@ -0,0 +1,175 @@
+import asyncio
+import datetime
+import logging
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple, Type
+
+from sqlalchemy import func, select
+
+from app.core.settings import (
+    CHANGE_FEED_LAG_SECONDS,
+    DB_FOLDERS,
+    REFERENCE_DATA_ENABLED,
+    REFERENCE_DATA_REFRESH_SECONDS,
+)
+from app.database.database import REPLICA, DbSession, LazySession, db, execute, folder_of, route_session, select_folder
+from app.models.corporation import Company, Sites
+
+logger = logging.getLogger(__name__)
+
+# Refreshes between two full reloads, which also catch the deleted rows
+FULL_RELOAD_EVERY = 20
+
+
+class CompanyRecord(NamedTuple):
+    """Immutable copy of the COMPANY columns exposed by the Company type."""
+
+    company: str
+    companyName: str
+    isLegalCompany: int
+    legislation: str
+    country: str
+    defaultAddress: str
+    vatNumber: str
+    store: 'ReferenceData'
+
+    @property
+    def companySites(self) -> Tuple['SiteRecord', ...]:
+        return self.store.sites_of(self.company)
+
+
+class SiteRecord(NamedTuple):
+    """Immutable copy of the FACILITY columns exposed by the Site type."""
+
+    code: str
+    name: str
+    country: str
+    sales: int
+    purchase: int
+    accounting: int
+    legalCompany: str
+    legislation: str
+    defaultAddress: str
+    store: 'ReferenceData'
+
+    @property
+    def company(self) -> Optional[CompanyRecord]:
+        return self.store.companies.get(self.legalCompany)
+
+
+def _columns(record: Type[NamedTuple]) -> List[str]:
+    return [name for name in record._fields if name != 'store']
+
+
+class ReferenceData:
+    """
+    The companies and sites of one folder, indexed by company and by code.
+    The dictionaries are replaced, never changed, so readers always see a consistent copy.
+    `generation` counts the refreshes that changed them, for the responses built from them.
+    """
+
+    def __init__(self, folder: str):
+        self.folder = folder
+        self.loaded = False
+        self.generation = 0
+        self.companies: Dict[str, CompanyRecord] = {}
+        self.sites: Dict[str, SiteRecord] = {}
+        self._sites_by_company: Dict[str, Tuple[SiteRecord, ...]] = {}
+        self._last_seen: Dict[str, Optional[datetime.datetime]] = {}
+        self._refreshes = 0
+
+    def sites_of(self, company: str) -> Tuple[SiteRecord, ...]:
+        return self._sites_by_company.get(company, ())
+
+    async def refresh(self, session: DbSession) -> None:
+        """Read the rows changed since the last refresh (UPDDATTIM_0), or every row for a full reload."""
+        full = self._refreshes % FULL_RELOAD_EVERY == 0
+        companies = await self._load(session, Company, CompanyRecord, 'company', self.companies, full)
+        sites = await self._load(session, Sites, SiteRecord, 'code', self.sites, full)
+        if companies != self.companies or sites != self.sites:
+            self.generation += 1
+        self.companies, self.sites = companies, sites
+
+        sites_by_company: Dict[str, List[SiteRecord]] = {}
+        for site in sorted(self.sites.values(), key=lambda site: site.code):
+            sites_by_company.setdefault(site.legalCompany, []).append(site)
+        self._sites_by_company = {company: tuple(sites) for company, sites in sites_by_company.items()}
+
+        self._refreshes += 1
+        self.loaded = True
+
+    async def _load(  # noqa: PLR0913, PLR0917
+        self,
+        session: DbSession,
+        model: Type[Any],
+        record: Type[NamedTuple],
+        key: str,
+        records: Dict[str, Any],
+        full: bool,
+    ) -> Dict[str, Any]:
+        table = model.__tablename__
+        last_seen = self._last_seen.get(table)
+
+        # a row count that moved means rows were deleted (or inserted before last_seen)
+        count = (await execute(session, select(func.count()).select_from(model))).scalar_one()
+        full = full or last_seen is None or count != len(records)
+
+        columns = _columns(record)
+        stmt = select(*(getattr(model, name) for name in columns), model.updateDatetime)
+        if not full:
+            # the last CHANGE_FEED_LAG_SECONDS seen are read again: a transaction committed since the
+            # last refresh may have stamped its rows before last_seen (see changes._settled)
+            stmt = stmt.where(model.updateDatetime >= last_seen - datetime.timedelta(seconds=CHANGE_FEED_LAG_SECONDS))
+
+        rows = (await execute(session, stmt)).all()
+        records = {} if full else dict(records)
+        for row in rows:
+            records[getattr(row, key)] = record(*row[: len(columns)], self)
+            last_seen = row[-1] if last_seen is None else max(last_seen, row[-1])
+
+        self._last_seen[table] = last_seen
+        return records
+
+
+class ReferenceStore:
+    """Reference data of every folder, loaded from the replica and refreshed in the background."""
+
+    def __init__(self, folders: Sequence[str] = DB_FOLDERS):
+        self._data = {folder.upper(): ReferenceData(folder) for folder in folders}
+
+    def get(self, folder: str) -> Optional[ReferenceData]:
+        """The reference data of `folder`, None until it is loaded."""
+        data = self._data.get(folder.upper())
+        return data if data is not None and data.loaded else None
+
+    async def refresh(self) -> None:
+        for data in self._data.values():
+            session = LazySession(db.SessionLocal)
+            route_session(session, REPLICA)
+            select_folder(session, data.folder)
+            try:
+                await data.refresh(session)
+            finally:
+                await session.close()
+
+    async def run(self) -> None:
+        """Refresh every REFERENCE_DATA_REFRESH_SECONDS, until cancelled."""
+        while True:
+            try:
+                await self.refresh()
+            except Exception:
+                # the previous copy stays in use
+                logger.exception('Refreshing the reference data failed')
+            await asyncio.sleep(REFERENCE_DATA_REFRESH_SECONDS)
+
+
+def reference_data(context: Dict[str, Any]) -> Optional[ReferenceData]:
+    """
+    The reference data a resolver can answer from, None when it must read the database:
+    the store is not loaded yet, or the request asks to read its own writes.
+    """
+    if not REFERENCE_DATA_ENABLED or context.get('read_your_writes'):
+        return None
+    return reference_store.get(folder_of(context['db']))
+
+
+reference_store = ReferenceStore()